@@ -0,0 +1,46 @@
+"""
+Latency of ADB input commands, a new adb shell session for each command against the long-lived input channel.
+Sends `input keyevent 0` (KEYCODE_UNKNOWN) by default, which does nothing in game,
+or taps at a given point.
+
+Usage:
+    python -m dev_tools.adb_input_benchmark <config_name> [n] [x y]
+"""
+import sys
+import time
+
+import numpy as np
+
+from module.config.config import NikkeConfig
+from module.device.device import Device
+from module.logger import logger
+
+
+def benchmark(device, channel, cmd, n):
+    device.config.override(ADB_INPUT_CHANNEL=channel)
+    # Warm up, input channel opens here
+    device.adb_input_send(cmd)
+    cost = []
+    for _ in range(n):
+        start = time.perf_counter()
+        device.adb_input_send(cmd)
+        cost.append(time.perf_counter() - start)
+    cost = np.array(cost) * 1000
+    name = 'Channel' if channel else 'Session'
+    logger.info(f'{name:<8} mean={round(cost.mean(), 1)}ms, p50={round(np.percentile(cost, 50), 1)}ms, '
+                f'p95={round(np.percentile(cost, 95), 1)}ms')
+
+
+if __name__ == '__main__':
+    config = NikkeConfig(sys.argv[1] if len(sys.argv) > 1 else 'nkas')
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    if len(sys.argv) > 4:
+        cmd = ['input', 'tap', sys.argv[3], sys.argv[4]]
+    else:
+        cmd = ['input', 'keyevent', '0']
+
+    device = Device(config=config)
+    logger.hr(f'{" ".join(cmd)}, {n} times')
+    benchmark(device, False, cmd, n)
+    benchmark(device, True, cmd, n)
+    device.adb_input_channel_close()
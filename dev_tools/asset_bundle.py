@@ -0,0 +1,16 @@
+"""
+Pack the cropped templates of all Buttons into ./bin/asset_bundle/<server>.<hash>.bundle.
+Run it after dev_tools/button_extract.py.
+NKAS rebuilds the bundle automatically when any asset changes, this is for building it in advance.
+
+Usage:
+    python -m dev_tools.asset_bundle [server ...]
+"""
+import sys
+
+from module.base.bundle import build_bundle
+from module.config import server
+
+if __name__ == '__main__':
+    for s in sys.argv[1:] or [server.server]:
+        build_bundle(s)
@@ -0,0 +1,65 @@
+"""
+Benchmark of Button.match_several() against the previous implementation,
+which masks the image and runs template matching again after every hit.
+
+Usage:
+    python -m dev_tools.match_several_benchmark [screenshot.png]
+"""
+import sys
+import time
+
+import numpy as np
+
+from module.base.utils import load_image, mask_area
+from module.logger import logger
+from module.rookie_arena.assets import POWER_CHECK
+
+
+def match_several_legacy(button, image, offset=30, threshold=0.85, static=True):
+    areas = []
+    while 1:
+        if button.match(image, offset=offset, threshold=threshold, static=static):
+            areas.append({'area': button._button_offset, 'location': button.location})
+            image = mask_area(image, button._button_offset)
+        else:
+            return areas
+
+
+def multi_hit_frame(button, background, hits):
+    """
+    Paste the template of button onto the background, in a column like the competitor list.
+    """
+    button.ensure_template()
+    image = background.copy()
+    template = button.image
+    h, w = template.shape[:2]
+    x1, y1 = button.area[:2]
+    for index in range(hits):
+        y = y1 + index * (h + 80) - 400
+        image[y:y + h, x1:x1 + w] = template
+    return image
+
+
+def benchmark(background, rounds=20):
+    button = POWER_CHECK
+    for hits in [1, 3, 5, 8]:
+        image = multi_hit_frame(button, background, hits)
+        result = {}
+        for name, func in [('legacy', match_several_legacy), ('nms', type(button).match_several)]:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                result[name] = func(button, image, threshold=0.85, static=False)
+            cost = (time.perf_counter() - start) / rounds
+            logger.attr(f'{name} hits={hits}', f'{round(cost * 1000, 2)} ms, found {len(result[name])}')
+        legacy = sorted(tuple(map(int, r['area'])) for r in result['legacy'])
+        nms = sorted(tuple(map(int, r['area'])) for r in result['nms'])
+        if legacy != nms:
+            logger.warning(f'Different results: legacy={legacy}, nms={nms}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        background = load_image(sys.argv[1])
+    else:
+        background = np.random.randint(0, 64, size=(1280, 720, 3), dtype=np.uint8)
+    benchmark(background)
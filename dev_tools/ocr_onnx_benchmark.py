@@ -0,0 +1,72 @@
+"""
+Compare accuracy and latency of OCR recognizers between the pytorch and onnx backend.
+
+The crop set is a folder of single line text images, with a `labels.txt` of `<file>\t<text>` in each line,
+same as the cnocr training format.
+
+Usage:
+    python -m dev_tools.ocr_onnx_benchmark <crop_folder> [name] [threads]
+
+<name> is the model name in OcrModel, default to `nikke`.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from module.base.utils import load_image
+from module.logger import logger
+from module.ocr.models import OcrModel
+
+
+def load_crops(folder):
+    crops = []
+    with open(os.path.join(folder, 'labels.txt'), encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            file, text = line.split('\t', 1)
+            crops.append((load_image(os.path.join(folder, file)), text))
+    return crops
+
+
+def benchmark(crops, name, backend, threads=0):
+    models = OcrModel()
+    models.set_backend(backend, threads=threads)
+    start = time.perf_counter()
+    model = models.__getattribute__(name)
+    load = time.perf_counter() - start
+    if model.backend != backend:
+        logger.warning(f'{backend} backend unavailable, skipped')
+        return None
+
+    # Warm up
+    model.ocr_for_single_line(crops[0][0])
+    cost, results = [], []
+    for image, _ in crops:
+        start = time.perf_counter()
+        results.append(model.ocr_for_single_line(image)['text'])
+        cost.append(time.perf_counter() - start)
+
+    cost = np.array(cost) * 1000
+    correct = sum([result == text for result, (_, text) in zip(results, crops)])
+    logger.info(f'{backend:<8} load={round(load, 2)}s, accuracy={correct}/{len(crops)}, '
+                f'mean={round(cost.mean(), 2)}ms, p95={round(np.percentile(cost, 95), 2)}ms')
+    return results
+
+
+if __name__ == '__main__':
+    folder = sys.argv[1]
+    name = sys.argv[2] if len(sys.argv) > 2 else 'nikke'
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    crops = load_crops(folder)
+    logger.hr(f'{name}, {len(crops)} crops')
+    torch_results = benchmark(crops, name, 'pytorch')
+    onnx_results = benchmark(crops, name, 'onnx', threads=threads)
+    if onnx_results is not None:
+        for result, onnx_result, (_, text) in zip(torch_results, onnx_results, crops):
+            if result != onnx_result:
+                logger.info(f'Different result: label={text}, pytorch={result}, onnx={onnx_result}')
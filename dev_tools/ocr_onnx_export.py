@@ -0,0 +1,41 @@
+"""
+Export recognizers of OcrModel from pytorch checkpoints to ONNX, for OCR_BACKEND='onnx'.
+ONNX models are saved next to checkpoints, such as ./bin/cnocr_models/nikke/t25.onnx
+
+Usage:
+    python -m dev_tools.ocr_onnx_export [name ...]
+
+<name> is the model name in OcrModel, such as `nikke`, `arena`, `cnocr`, default to all.
+"""
+import os
+import sys
+
+from module.logger import logger
+from module.ocr.nikke_ocr import onnx_model_fp
+
+# Model name in OcrModel: (rec_model_name, checkpoint)
+EXPORTS = {
+    'nikke': ('densenet_lite_136-gru', './bin/cnocr_models/nikke/t25.ckpt'),
+    'arena': ('densenet_lite_136-gru', './bin/cnocr_models/nikke/t27.ckpt'),
+    'cnocr': ('densenet_lite_136-fc', './bin/cnocr_models/cnocr/cnocr-v2.2-densenet_lite_136-fc.ckpt'),
+    'cnocr_gru': ('densenet_lite_136-gru', './bin/cnocr_models/cnocr/cnocr-v2.2-densenet_lite_136-gru.ckpt'),
+}
+
+
+def export(name):
+    from cnocr.cli import export_onnx
+
+    rec_model_name, model_fp = EXPORTS[name]
+    if not os.path.exists(model_fp):
+        logger.warning(f'Checkpoint not found: {model_fp}')
+        return False
+    output = onnx_model_fp(model_fp)
+    logger.info(f'Export {name}: {model_fp} -> {output}')
+    # Same as `cnocr export-onnx -m <rec_model_name> -i <ckpt> -o <onnx>`
+    export_onnx.main(['-m', rec_model_name, '-i', model_fp, '-o', output], standalone_mode=False)
+    return True
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or EXPORTS.keys():
+        export(name)
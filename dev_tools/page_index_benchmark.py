@@ -0,0 +1,69 @@
+"""
+Benchmark of PageIndex against checking ui_pages one by one.
+
+Usage:
+    python -m dev_tools.page_index_benchmark <folder of 720x1280 screenshots> [rounds]
+"""
+import os
+import sys
+import time
+
+from module.base.frame import FRAME_CACHE
+from module.base.utils import load_image
+from module.config.config import NikkeConfig
+from module.logger import logger
+from module.ui.ui import UI
+
+
+def serial(image):
+    for page in UI.ui_pages:
+        if page.check_button is None:
+            continue
+        if page.check_button.match(image, offset=(30, 30), threshold=NikkeConfig.BUTTON_MATCH_SIMILARITY):
+            return page, 0
+    return None, 0
+
+
+def indexed(image):
+    pages = UI.ui_page_index.sort(image)
+    for count, page in enumerate(pages):
+        if page.check_button.match(image, offset=(30, 30), threshold=NikkeConfig.BUTTON_MATCH_SIMILARITY):
+            return page, count + 1
+    return None, len(pages)
+
+
+def benchmark(folder, rounds=10):
+    files = [os.path.join(folder, file) for file in os.listdir(folder) if file.endswith('.png')]
+    images = [load_image(file) for file in files]
+    # Load templates before timing
+    for image in images:
+        serial(image)
+
+    for name, func in [('serial', serial), ('indexed', indexed)]:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for image in images:
+                # As screenshots in real use, check buttons share the integral image and the prefilter applies
+                FRAME_CACHE.new_frame(image)
+                func(image)
+        cost = (time.perf_counter() - start) / rounds / max(len(images), 1)
+        logger.attr(name, f'{round(cost * 1000, 2)} ms/frame')
+
+    mismatch, matched = 0, 0
+    for file, image in zip(files, images):
+        FRAME_CACHE.new_frame(image)
+        expected, _ = serial(image)
+        FRAME_CACHE.new_frame(image)
+        result, count = indexed(image)
+        matched += count
+        if expected is not result:
+            mismatch += 1
+            logger.warning(f'{file}: serial={expected}, indexed={result}')
+        else:
+            logger.info(f'{file}: {result}, matched {count} pages')
+    logger.attr('Mismatch', f'{mismatch}/{len(images)}')
+    logger.attr('Matched', f'{round(matched / max(len(images), 1), 2)}/{len(UI.ui_page_index.pages)} pages per frame')
+
+
+if __name__ == '__main__':
+    benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 10)
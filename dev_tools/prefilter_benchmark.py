@@ -0,0 +1,97 @@
+"""
+Check the mean color prefilter of Button.match() on a corpus of saved screenshots.
+For each button and tolerance, count false rejects, which are screenshots the prefilter rejects
+but TM_CCOEFF_NORMED matches, and time of the prefilter against matching.
+`needed` is the lowest tolerance without false rejects on the corpus.
+Buttons with no false rejects and a real saving can set `BUTTON.prefilter = <tolerance>`.
+
+Screenshots in ./assets can be used as the corpus, most of them are full screenshots.
+
+Usage:
+    python -m dev_tools.prefilter_benchmark <folder of 720x1280 screenshots> [offset] [BUTTON_NAME ...]
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from module.base.button import Button
+from module.base.frame import FRAME_CACHE
+from module.base.resource import Resource, import_all_assets
+from module.base.utils import crop, load_image
+from module.config.config import NikkeConfig
+from module.logger import logger
+
+TOLERANCES = [30, 40, 50, 80]
+
+
+def evaluate(button, images, offset, threshold):
+    """
+    Returns:
+        np.ndarray, np.ndarray, float, float: Color distance and similarity on each screenshot,
+            prefilter cost and matching cost in ms per screenshot.
+    """
+    search_area = button._parse_offset(offset) + button.area
+    distances, similarities = [], []
+    cost_prefilter, cost_match = 0., 0.
+    for image in images:
+        FRAME_CACHE.new_frame(image)
+        # Integral image is shared by all buttons on a frame, don't count it
+        integral = FRAME_CACHE.integral(image, force=True)
+        start = time.perf_counter()
+        distance = button.color_distance(image, search_area, integral)
+        cost_prefilter += time.perf_counter() - start
+
+        start = time.perf_counter()
+        res = cv2.matchTemplate(button.image, crop(image, search_area), cv2.TM_CCOEFF_NORMED)
+        _, similarity, _, _ = cv2.minMaxLoc(res)
+        cost_match += time.perf_counter() - start
+
+        distances.append(0. if distance is None else distance)
+        similarities.append(similarity)
+    n = len(images)
+    return np.array(distances), np.array(similarities), cost_prefilter / n * 1000, cost_match / n * 1000
+
+
+def report(folder, offset, names=None):
+    images = [load_image(os.path.join(folder, file)) for file in os.listdir(folder) if file.endswith('.png')]
+    images = [image for image in images if image.shape[:2] == (1280, 720)]
+    if not images:
+        logger.warning(f'No screenshots in {folder}')
+        return
+    import_all_assets()
+    threshold = NikkeConfig.BUTTON_MATCH_SIMILARITY
+    buttons = [obj for obj in Resource.instances.values()
+               if isinstance(obj, Button) and not obj.is_gif and obj.color is not None]
+    if names:
+        buttons = [button for button in buttons if button.name in names]
+
+    logger.hr(f'Prefilter on {len(images)} screenshots, offset={offset}')
+    total = {tolerance: [0, 0] for tolerance in TOLERANCES}
+    for button in sorted(buttons, key=lambda b: b.name):
+        button.ensure_template()
+        distances, similarities, cost_prefilter, cost_match = evaluate(button, images, offset, threshold)
+        matched = similarities > threshold
+        needed = distances[matched].max() if matched.any() else 0.
+        result = [f'matched={matched.sum()}, needed={round(needed, 1)}']
+        for tolerance in TOLERANCES:
+            reject = distances > tolerance
+            false_reject = int(np.sum(reject & matched))
+            total[tolerance][0] += false_reject
+            total[tolerance][1] += int(reject.sum())
+            result.append(f'{tolerance}: false_reject={false_reject}, reject={reject.sum()}')
+        result.append(f'prefilter={round(cost_prefilter, 3)}ms, match={round(cost_match, 3)}ms')
+        logger.info(f'{button.name}: {", ".join(result)}')
+
+    for tolerance, (false_reject, reject) in total.items():
+        logger.attr(f'Tolerance {tolerance}', f'false_reject={false_reject}, reject={reject}')
+
+
+if __name__ == '__main__':
+    report(
+        sys.argv[1],
+        offset=int(sys.argv[2]) if len(sys.argv) > 2 else NikkeConfig.BUTTON_OFFSET,
+        names=sys.argv[3:],
+    )
@@ -0,0 +1,69 @@
+"""
+Accuracy and speed of pyramid matching against full resolution matching, on a corpus of saved screenshots.
+Buttons that agree on every screenshot and run faster can set `BUTTON.pyramid = <scale>`.
+
+Usage:
+    python -m dev_tools.pyramid_benchmark <folder of 720x1280 screenshots>
+"""
+import os
+import sys
+import time
+
+from module.base.button import Button
+from module.base.resource import Resource, import_all_assets
+from module.base.utils import load_image
+from module.config.config import NikkeConfig
+from module.logger import logger
+
+SCALES = [2, 4]
+
+
+def evaluate(button, images, scale, threshold):
+    """
+    Returns:
+        float, float: Agreement rate with full resolution matching, speedup.
+    """
+    agree = 0
+    cost_full, cost_pyramid = 0., 0.
+    for image in images:
+        start = time.perf_counter()
+        full = button.match_similarity(image, static=False, pyramid=0)
+        cost_full += time.perf_counter() - start
+        start = time.perf_counter()
+        pyramid = button.match_similarity(image, static=False, pyramid=scale)
+        cost_pyramid += time.perf_counter() - start
+
+        hit_full, hit_pyramid = full[0] > threshold, pyramid[0] > threshold
+        if hit_full == hit_pyramid:
+            if not hit_full or (abs(full[1][0] - pyramid[1][0]) <= 2 and abs(full[1][1] - pyramid[1][1]) <= 2):
+                agree += 1
+    return agree / len(images), cost_full / max(cost_pyramid, 1e-9)
+
+
+def report(folder):
+    images = [load_image(os.path.join(folder, file)) for file in os.listdir(folder) if file.endswith('.png')]
+    if not images:
+        logger.warning(f'No screenshots in {folder}')
+        return
+    import_all_assets()
+    threshold = NikkeConfig.BUTTON_MATCH_SIMILARITY
+    buttons = [obj for obj in Resource.instances.values() if isinstance(obj, Button) and not obj.is_gif]
+
+    logger.hr(f'Pyramid matching on {len(images)} screenshots')
+    for button in sorted(buttons, key=lambda b: b.name):
+        button.ensure_template()
+        result = []
+        recommend = 0
+        for scale in SCALES:
+            if button._match_pyramid(images[0], scale) is None:
+                result.append(f'x{scale}: too small')
+                continue
+            agreement, speedup = evaluate(button, images, scale, threshold)
+            result.append(f'x{scale}: agree={round(agreement * 100, 1)}%, speedup={round(speedup, 2)}')
+            if agreement == 1 and speedup > 1:
+                recommend = scale
+        logger.info(f'{button.name}: {", ".join(result)}, recommend pyramid={recommend}')
+
+
+if __name__ == '__main__':
+    report(sys.argv[1])
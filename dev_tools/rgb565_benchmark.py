@@ -0,0 +1,77 @@
+"""
+Check Rgb565Decoder against the cv2 arithmetic converting it replaced, on all 65536 RGB565 values,
+then compare their speed on a full 720x1280 frame.
+
+Usage:
+    python -m dev_tools.rgb565_benchmark
+"""
+import time
+
+import cv2
+import numpy as np
+
+from module.device.method.rgb565 import Rgb565Decoder
+from module.logger import logger
+
+
+def rgb565_to_rgb888_legacy(arr):
+    """
+    The converting in DroidCast.screenshot_droidcast_raw() before Rgb565Decoder.
+    """
+    r = cv2.bitwise_and(arr, 0b1111100000000000)
+    r = cv2.convertScaleAbs(r, alpha=0.00390625)
+    m = cv2.convertScaleAbs(r, alpha=0.03125)
+    cv2.add(r, m, dst=r)
+
+    g = cv2.bitwise_and(arr, 0b0000011111100000)
+    g = cv2.convertScaleAbs(g, alpha=0.125)
+    m = cv2.convertScaleAbs(g, alpha=0.015625, dst=m)
+    cv2.add(g, m, dst=g)
+
+    b = cv2.bitwise_and(arr, 0b0000000000011111)
+    b = cv2.convertScaleAbs(b, alpha=8)
+    m = cv2.convertScaleAbs(b, alpha=0.03125, dst=m)
+    cv2.add(b, m, dst=b)
+
+    return cv2.merge([r, g, b])
+
+
+def check_all_values():
+    arr = np.arange(65536, dtype=np.uint16).reshape((256, 256))
+    expected = rgb565_to_rgb888_legacy(arr)
+    for bgr in [False, True]:
+        result = Rgb565Decoder(width=256, height=256, bgr=bgr).decode(arr)
+        if bgr:
+            result = result[:, :, ::-1]
+        diff = np.argwhere(np.any(result != expected, axis=2))
+        if len(diff):
+            y, x = diff[0]
+            logger.error(f'bgr={bgr}: {len(diff)} values differ, '
+                         f'first: {hex(arr[y, x])} -> {result[y, x]}, expected {expected[y, x]}')
+        else:
+            logger.info(f'bgr={bgr}: all 65536 values match')
+
+
+def benchmark(n=100):
+    decoder = Rgb565Decoder(width=720, height=1280)
+    decoder.raw[:] = np.random.randint(0, 65536, size=decoder.shape, dtype=np.uint16)
+    out = np.empty((1280, 720, 3), dtype=np.uint8)
+
+    def timeit(func):
+        func()
+        start = time.perf_counter()
+        for _ in range(n):
+            func()
+        return (time.perf_counter() - start) / n * 1000
+
+    legacy = timeit(lambda: rgb565_to_rgb888_legacy(decoder.raw))
+    lut = timeit(lambda: decoder.decode())
+    lut_out = timeit(lambda: decoder.decode(out=out))
+    logger.info(f'Legacy cv2 arithmetic: {round(legacy, 2)}ms')
+    logger.info(f'Lookup table: {round(lut, 2)}ms')
+    logger.info(f'Lookup table, reused output: {round(lut_out, 2)}ms')
+
+
+if __name__ == '__main__':
+    check_all_values()
+    benchmark()
@@ -0,0 +1,87 @@
+"""
+Simulate the task queue of a user config on a virtual clock, without emulator.
+Each task takes a fixed virtual duration, then delays itself the way most tasks do,
+which is to the next server update. Config changes are kept in memory, the config file is not modified.
+
+Useful to see how task ordering changes with SCHEDULER_PRIORITY or task delays,
+and how fast the scheduler itself is.
+
+Usage:
+    python -m dev_tools.scheduler_simulation <config_name> [days]
+"""
+import copy
+import sys
+import time
+from collections import Counter
+
+from module.base.clock import CLOCK
+from module.config.config import NikkeConfig
+from module.logger import logger
+
+# Virtual seconds each task takes, default to 120
+TASK_DURATION = {
+    'Restart': 60,
+    'SimulationRoom': 900,
+    'TribeTower': 600,
+    'Interception': 600,
+    'RookieArena': 300,
+}
+# Arguments of task_delay() after each task, default to server_update=True
+TASK_DELAY = {
+    'WeeklyGift': {'minute': 10080},
+    'MonthlyGift': {'minute': 43200},
+    'RubbishShop': {'minute': 10080},
+}
+
+
+class SimulatedConfig(NikkeConfig):
+    # Config data shared by instances, instead of the config file
+    store = None
+
+    def read_file(self, config_name, is_template=False):
+        if SimulatedConfig.store is None:
+            SimulatedConfig.store = super().read_file(config_name, is_template)
+        return copy.deepcopy(SimulatedConfig.store)
+
+    def write_file(self, config_name, data, mod_name='nkas'):
+        SimulatedConfig.store = copy.deepcopy(data)
+
+
+def simulate(config_name, days=7):
+    CLOCK.set_virtual()
+    config = SimulatedConfig(config_name)
+    start = CLOCK.time()
+    end = start + days * 86400
+    history = []
+    busy = 0.
+
+    real = time.perf_counter()
+    while CLOCK.time() < end:
+        task = config.get_next()
+        config.task = task
+        config.bind(task)
+        if task.next_run > CLOCK.now():
+            CLOCK.advance((task.next_run - CLOCK.now()).total_seconds())
+            continue
+
+        history.append((CLOCK.now(), task.command))
+        duration = TASK_DURATION.get(task.command, 120)
+        CLOCK.advance(duration)
+        busy += duration
+        config.task_delay(**TASK_DELAY.get(task.command, {'server_update': True}))
+    real = time.perf_counter() - real
+    CLOCK.set_real()
+
+    logger.hr('Simulation result')
+    for run, command in history[:50]:
+        logger.info(f'{run} {command}')
+    if len(history) > 50:
+        logger.info(f'... {len(history) - 50} more')
+    for command, count in Counter([command for _, command in history]).most_common():
+        logger.attr(command, count)
+    logger.attr('Simulated', f'{days} days, {len(history)} tasks, busy {round(busy / (end - start) * 100, 1)}%')
+    logger.attr('Cost', f'{round(real, 2)}s, {round(len(history) / max(real, 1e-9), 1)} tasks/s')
+
+
+if __name__ == '__main__':
+    simulate(sys.argv[1] if len(sys.argv) > 1 else 'nkas', int(sys.argv[2]) if len(sys.argv) > 2 else 7)
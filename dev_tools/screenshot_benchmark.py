@@ -0,0 +1,64 @@
+"""
+Latency of Device.screenshot() in blocking mode and in prefetch mode, on a connected emulator.
+Each iteration takes a screenshot then simulates `work` ms of image processing,
+and every `input_every` iterations pretends a click was sent, so prefetched frames before it are dropped.
+
+Usage:
+    python -m dev_tools.screenshot_benchmark <config_name> [iterations] [work_ms] [input_every]
+"""
+import sys
+import time
+
+import numpy as np
+
+from module.config.config import NikkeConfig
+from module.device.device import Device
+from module.logger import logger
+
+
+def run(device, prefetch, iterations, work, input_every):
+    """
+    Returns:
+        list[float], float: Seconds blocked in each screenshot(), total seconds.
+    """
+    device.config.override(Emulator_ScreenshotPrefetch=prefetch)
+    device.screenshot_prefetch_stop()
+    # Warm up connections
+    device.screenshot()
+
+    cost = []
+    total = time.perf_counter()
+    for n in range(iterations):
+        if input_every and n % input_every == 0:
+            device.input_time = time.time()
+        start = time.perf_counter()
+        device.screenshot()
+        cost.append(time.perf_counter() - start)
+        time.sleep(work)
+    total = time.perf_counter() - total
+
+    device.screenshot_prefetch_stop()
+    return cost, total
+
+
+def show(name, cost, total):
+    cost = np.array(cost) * 1000
+    logger.info(f'{name:<10} screenshot(): mean={round(cost.mean(), 1)}ms, '
+                f'p50={round(np.percentile(cost, 50), 1)}ms, p95={round(np.percentile(cost, 95), 1)}ms, '
+                f'loop={round(total / len(cost) * 1000, 1)}ms/iter')
+
+
+if __name__ == '__main__':
+    config_name = sys.argv[1] if len(sys.argv) > 1 else 'nkas'
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    work = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.1
+    input_every = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+
+    config = NikkeConfig(config_name)
+    device = Device(config=config)
+    device.disable_stuck_detection()
+    logger.hr(f'{config.Emulator_ScreenshotMethod}, interval={config.Emulator_ScreenshotInterval}s, '
+              f'work={int(work * 1000)}ms, input every {input_every} frames')
+
+    show('Blocking', *run(device, False, iterations, work, input_every))
+    show('Prefetch', *run(device, True, iterations, work, input_every))
@@ -0,0 +1,54 @@
+"""
+Record a task on a live emulator, or replay a recorded session offline as a benchmark of detection code.
+
+Usage:
+    python -m dev_tools.session_replay record <config_name> <task>
+    python -m dev_tools.session_replay replay <config_name> <session_folder> <task> [click|clock]
+
+<task> is the method name of NikkeAutoScript, such as `reward`, `shop`, `simulation_room`.
+Replaying doesn't save config changes made by the task.
+"""
+import sys
+import time
+
+from main import NikkeAutoScript
+from module.base.frame import FRAME_CACHE
+from module.device.replay import ReplayDevice, ReplayEnd, SessionRecorder
+from module.logger import logger
+
+
+def record(config_name, task):
+    script = NikkeAutoScript(config_name)
+    recorder = SessionRecorder(script.device).start()
+    try:
+        script.run(task)
+    finally:
+        recorder.stop()
+
+
+def replay(config_name, folder, task, mode='click'):
+    script = NikkeAutoScript(config_name)
+    script.config.auto_update = False
+    device = ReplayDevice(script.config, folder, mode=mode)
+    device.disable_stuck_detection()
+    script.device = device
+
+    start = time.perf_counter()
+    try:
+        script.__getattribute__(task)()
+        logger.info('Task finished before session ends')
+    except ReplayEnd as e:
+        logger.info(f'Replay end: {e}')
+    cost = time.perf_counter() - start
+
+    logger.hr('Replay result')
+    device.replay_show()
+    FRAME_CACHE.show()
+    logger.attr('Time', f'{round(cost, 2)}s, {round(cost / max(device.served, 1) * 1000, 2)}ms/frame')
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'record':
+        record(sys.argv[2], sys.argv[3])
+    else:
+        replay(sys.argv[2], sys.argv[3], sys.argv[4], *sys.argv[5:6])
@@ -0,0 +1,127 @@
+"""
+Compare the vectorized swipe path generator against the point by point one it replaced.
+Checks that paths have the same statistics, then compares their speed.
+
+Usage:
+    python -m dev_tools.swipe_benchmark [n]
+"""
+import sys
+import time
+
+import numpy as np
+
+from module.device.method.minitouch import bezier_swipes, insert_swipe, random_normal_distribution, random_rho, \
+    random_theta
+from module.logger import logger
+
+# Start, end, speed
+CASES = [
+    ((400, 400), (600, 600), 20),
+    ((648, 515.2), (648, 252)),
+    ((1062, 201.6), (540, 201.6)),
+    ((100, 100), (1200, 650), 5),
+]
+
+
+def insert_swipe_legacy(p0, p3, speed=15, min_distance=10):
+    """
+    minitouch.insert_swipe() before bezier_swipes().
+    """
+    p0 = np.array(p0)
+    p3 = np.array(p3)
+
+    distance = np.linalg.norm(p3 - p0)
+    p1 = 2 / 3 * p0 + 1 / 3 * p3 + random_theta() * random_rho(distance * 0.1)
+    p2 = 1 / 3 * p0 + 2 / 3 * p3 + random_theta() * random_rho(distance * 0.1)
+
+    segments = max(int(distance / speed) + 1, 5)
+    lower = random_normal_distribution(-85, -60)
+    upper = random_normal_distribution(80, 90)
+    theta = np.arange(lower + 0., upper + 0.0001, (upper - lower) / segments)
+    ts = np.sin(theta / 180 * np.pi)
+    ts = np.sign(ts) * abs(ts) ** 0.9
+    ts = (ts - min(ts)) / (max(ts) - min(ts))
+
+    points = []
+    prev = (-100, -100)
+    for t in ts:
+        point = p0 * (1 - t) ** 3 + 3 * p1 * t * (1 - t) ** 2 + 3 * p2 * t ** 2 * (1 - t) + p3 * t ** 3
+        point = point.astype(int).tolist()
+        if np.linalg.norm(np.subtract(point, prev)) < min_distance:
+            continue
+
+        points.append(point)
+        prev = point
+
+    if len(points[1:]):
+        distance = np.linalg.norm(np.subtract(points[1:], points[0]), axis=1)
+        mask = np.append(True, distance > min_distance)
+        points = np.array(points)[mask].tolist()
+    else:
+        points = [p0, p3]
+
+    return points
+
+
+def path_stats(path, p0, p3):
+    """
+    Returns:
+        tuple: Amount of points, max deviation from the straight line, distance of the middle point to the center.
+    """
+    path = np.asarray(path, dtype=float)
+    p0, p3 = np.asarray(p0, dtype=float), np.asarray(p3, dtype=float)
+    direction = (p3 - p0) / max(np.linalg.norm(p3 - p0), 1e-9)
+    vector = path - p0
+    deviation = np.abs(vector[:, 0] * direction[1] - vector[:, 1] * direction[0])
+    middle = np.linalg.norm(path[len(path) // 2] - (p0 + p3) / 2)
+    return len(path), deviation.max(), middle
+
+
+def ks_statistic(a, b):
+    """
+    Two sample Kolmogorov-Smirnov statistic.
+    """
+    a, b = np.sort(a), np.sort(b)
+    values = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, values, side='right') / len(a)
+    cdf_b = np.searchsorted(b, values, side='right') / len(b)
+    return np.max(np.abs(cdf_a - cdf_b))
+
+
+def check_distribution(n):
+    logger.hr('Distribution')
+    for case in CASES:
+        p0, p3, *speed = case
+        speed = speed[0] if speed else 15
+        legacy = np.array([path_stats(insert_swipe_legacy(p0, p3, speed=speed), p0, p3) for _ in range(n)])
+        new = np.array([path_stats(path, p0, p3) for path in bezier_swipes(p0, p3, n=n, speed=speed)])
+        # Critical value of KS test at alpha=0.001
+        critical = 1.95 * np.sqrt(2 / n)
+        for index, name in enumerate(['points', 'deviation', 'middle']):
+            ks = ks_statistic(legacy[:, index], new[:, index])
+            logger.info(f'{p0} -> {p3} {name:<9}: legacy mean={round(legacy[:, index].mean(), 2)}, '
+                        f'new mean={round(new[:, index].mean(), 2)}, ks={round(ks, 3)}'
+                        f'{"" if ks < critical else " DIFFERENT"}')
+
+
+def benchmark(n):
+    logger.hr('Speed')
+    for case in CASES:
+        p0, p3, *speed = case
+        speed = speed[0] if speed else 15
+        start = time.perf_counter()
+        for _ in range(n):
+            insert_swipe_legacy(p0, p3, speed=speed)
+        legacy = (time.perf_counter() - start) / n * 1000
+        # Generated in batches of SWIPE_POOL_SIZE as in real use
+        start = time.perf_counter()
+        for _ in range(n):
+            insert_swipe(p0, p3, speed=speed)
+        new = (time.perf_counter() - start) / n * 1000
+        logger.info(f'{p0} -> {p3}: legacy {round(legacy, 3)}ms, new {round(new, 3)}ms per path')
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    check_distribution(n)
+    benchmark(n)
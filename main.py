@@ -1,11 +1,14 @@
 import os
 import re
 import time
-from datetime import datetime, timedelta
+from datetime import timedelta
 from functools import cached_property
 
 import inflection
 
+from module.base.clock import CLOCK
+from module.base.frame import FRAME_CACHE
+from module.base.tracker import LOCATION_TRACKER
 from module.config.config import NikkeConfig, TaskEnd
 from module.config.utils import deep_get, deep_set
 from module.exception import (
@@ -23,6 +26,7 @@ class NikkeAutoScript:
     def __init__(self, config_name="nkas"):
         logger.hr("Start", level=0)
         self.config_name = config_name
+        self.start_time = time.perf_counter()
 
     @cached_property
     def config(self):
@@ -101,26 +105,32 @@ class NikkeAutoScript:
 
     def save_error_log(self):
         """
-        Save last 60 screenshots in ./log/error/<timestamp>
+        Save last screenshots in ./log/error/<timestamp>
         Save logs to ./log/error/<timestamp>/log.txt
+        Files are written in background, so restarting the game is not blocked.
         """
-
-        from module.base.utils import save_image
-        from module.handler.sensitive_info import handle_sensitive_logs
+        from module.device.history import ERROR_DUMP
 
         if not os.path.exists("./log/error"):
             os.mkdir("./log/error")
         folder = f"./log/error/{int(time.time() * 1000)}"
         logger.warning(f"Saving error: {folder}")
         os.mkdir(folder)
-        for data in self.device.screenshot_deque:
-            image_time = datetime.strftime(data["time"], "%Y-%m-%d_%H-%M-%S-%f")
-            # 遮挡个人消息
-            # image = handle_sensitive_image(data['image'])
-            image = data["image"]
-            save_image(image, f"{folder}/{image_time}.png")
+        history = self.device.screenshot_history
+        history.show()
+        # Read logs now, before the next task writes its own
         with open(logger.log_file, "r", encoding="utf-8") as f:
             lines = f.readlines()
+        ERROR_DUMP.submit(self._save_error_log, folder, history.snapshot(), lines)
+
+    def _save_error_log(self, folder, frames, lines):
+        from module.handler.sensitive_info import handle_sensitive_logs
+
+        start_time = time.perf_counter()
+        try:
+            # 遮挡个人消息
+            # image = handle_sensitive_image(data['image'])
+            self.device.screenshot_history.save(frames, folder)
             start = 0
             for index, line in enumerate(lines):
                 line = line.strip(" \r\t\n")
@@ -130,8 +140,12 @@ class NikkeAutoScript:
             lines = lines[start - 2:]
             # 替换真实路径
             lines = handle_sensitive_logs(lines)
-        with open(f"{folder}/log.txt", "w", encoding="utf-8") as f:
-            f.writelines(lines)
+            with open(f"{folder}/log.txt", "w", encoding="utf-8") as f:
+                f.writelines(lines)
+        except Exception as e:
+            logger.exception(e)
+        logger.info(f"Error saved: {folder}, {len(frames)} frames, "
+                    f"cost {round(time.perf_counter() - start_time, 2)}s")
 
     def restart(self):
         from module.handler.login import LoginHandler
@@ -266,7 +280,7 @@ class NikkeAutoScript:
         """
         self.config.start_watching()
         while 1:
-            if datetime.now() > future:
+            if CLOCK.now() > future:
                 return True
 
             # if self.stop_event is not None:
@@ -275,7 +289,7 @@ class NikkeAutoScript:
             #         logger.info(f"[{self.config_name}] exited. Reason: Update")
             #         exit(0)
 
-            time.sleep(5)
+            CLOCK.sleep(5)
             """
                 在等待过程中持续对比配置文件的最后更改时间
             """
@@ -306,7 +320,7 @@ class NikkeAutoScript:
             if self.config.task.command != "NKAS":
                 release_resources(next_task=task.command)
 
-            if task.next_run > datetime.now():
+            if task.next_run > CLOCK.now():
                 logger.info(f"Wait until {task.next_run} for task `{task.command}`")
                 method = self.config.Optimization_WhenTaskQueueEmpty
 
@@ -350,6 +364,13 @@ class NikkeAutoScript:
         logger.info(f"Start scheduler loop: {self.config_name}")
         is_first = True
         failure_record = {}
+        # Load OCR models while connecting to device
+        from module.ocr.models import OCR_MODEL
+
+        OCR_MODEL.set_backend(self.config.OCR_BACKEND, threads=self.config.OCR_THREADS)
+        if self.config.OCR_SERVER:
+            OCR_MODEL.set_server(self.config.OCR_SERVER_PORT)
+        OCR_MODEL.preload(self.config.OCR_PRELOAD)
 
         while 1:
             task = self.get_next_task()
@@ -362,6 +383,8 @@ class NikkeAutoScript:
                 continue
 
             # Run
+            if is_first:
+                logger.attr("Startup", f"{round(time.perf_counter() - self.start_time, 2)}s")
             logger.info(f"Scheduler: Start task `{task}`")
             self.device.stuck_record_clear()
             self.device.click_record_clear()
@@ -377,6 +400,10 @@ class NikkeAutoScript:
 
             success = self.run(inflection.underscore(task))
             logger.info(f"Scheduler: End task `{task}`")
+            FRAME_CACHE.show()
+            LOCATION_TRACKER.show()
+            if self.config.Emulator_ScreenshotAdaptive:
+                self.device.screenshot_pacer.show()
             is_first = False
 
             """
@@ -2,6 +2,7 @@ import time
 from functools import cached_property
 
 from module.base.button import Button
+from module.base.frame import FRAME_CACHE
 from module.base.timer import Timer
 from module.base.utils import float2str, point2str
 from module.config.config import NikkeConfig
@@ -13,6 +14,8 @@ from module.ocr.models import OCR_MODEL
 class ModuleBase:
     config: NikkeConfig
     device: Device
+    # OCR models used by this task, loaded in background when the task starts
+    ocr_preload = []
 
     def __init__(self, config, device=None, task=None):
         """
@@ -47,6 +50,8 @@ class ModuleBase:
             self.device = device
 
         self.interval_timer = {}
+        if self.ocr_preload:
+            OCR_MODEL.preload(self.ocr_preload)
 
     @cached_property
     def ocr_models(self):
@@ -81,6 +86,71 @@ class ModuleBase:
 
         return appear
 
+    def appear_bank(self, bank, offset=0, interval=0, threshold=None, static=True, first=False) -> list[dict]:
+        """
+        Like appear(), but checks all buttons of a TemplateBank in one call.
+
+        Args:
+            bank (TemplateBank):
+            offset: Same as appear(), 0 for color check.
+            interval (int, float): Interval of each button, buttons in interval are skipped,
+                and only the buttons returned are reset.
+            threshold:
+            static (bool):
+            first (bool): True to stop at the first hit, like appear() on buttons one by one.
+
+        Returns:
+            list[dict]: [{'button': Button, 'similarity': float, 'area': tuple, 'location': tuple}]
+                of the buttons appeared, in the order of bank.
+        """
+        buttons = []
+        for button in bank:
+            self.device.stuck_record_add(button)
+            if interval:
+                if button.name in self.interval_timer:
+                    if self.interval_timer[button.name].limit != interval:
+                        self.interval_timer[button.name] = Timer(interval)
+                else:
+                    self.interval_timer[button.name] = Timer(interval)
+                if not self.interval_timer[button.name].reached():
+                    continue
+            buttons.append(button)
+
+        if offset:
+            if isinstance(offset, bool):
+                offset = self.config.BUTTON_OFFSET
+
+            hits = bank.match(self.device.image, offset=offset,
+                              threshold=self.config.BUTTON_MATCH_SIMILARITY if not threshold else threshold,
+                              static=static, buttons=buttons, first=first)
+        else:
+            hits = bank.appear_on(self.device.image,
+                                  threshold=self.config.COLOR_SIMILAR_THRESHOLD if not threshold else threshold,
+                                  buttons=buttons, first=first)
+
+        if interval:
+            for hit in hits:
+                self.interval_timer[hit['button'].name].reset()
+
+        return hits
+
+    def appear_on_many(self, buttons, threshold=None) -> list[bool]:
+        """
+        Color check on several buttons at once.
+
+        Args:
+            buttons (list[Button]):
+            threshold (int): Default to COLOR_SIMILAR_THRESHOLD.
+
+        Returns:
+            list[bool]: Whether each button appears.
+        """
+        for button in buttons:
+            self.device.stuck_record_add(button)
+
+        return Button.appear_on_many(self.device.image, buttons,
+                                     threshold=self.config.COLOR_SIMILAR_THRESHOLD if not threshold else threshold)
+
     def appear_then_click(self, button, offset=0, interval=0, threshold=None,
                           static=True, screenshot=False) -> bool:
 
@@ -93,17 +163,65 @@ class ModuleBase:
 
         return appear
 
-    def appear_text(self, text, interval=0, area=None, model='cnocr') -> bool or tuple:
-        if interval:
-            if text in self.interval_timer:
-                if self.interval_timer[text].limit != interval:
-                    self.interval_timer[text] = Timer(interval)
-            else:
+    def ocr_frame(self, area=None, model='cnocr'):
+        """
+        OCR result of the current screenshot, detected once and shared by all text queries on this frame.
+
+        Args:
+            area (tuple): Crop area, None for the whole screen.
+            model (str): Attribute name in OcrModel.
+
+        Returns:
+            list[dict]: Output of NikkeOcr.ocr()
+        """
+        image = self.device.image
+        key = ('ocr', model, area)
+        result = FRAME_CACHE.get(image, key)
+        if result is None:
+            result = self.ocr_models.__getattribute__(model).ocr(image, area=area)
+            FRAME_CACHE.set(image, key, result)
+        return result
+
+    def _text_interval_reached(self, text, interval):
+        if text in self.interval_timer:
+            if self.interval_timer[text].limit != interval:
                 self.interval_timer[text] = Timer(interval)
-            if not self.interval_timer[text].reached():
-                return False
+        else:
+            self.interval_timer[text] = Timer(interval)
+        return self.interval_timer[text].reached()
+
+    def appear_texts(self, texts, interval=0, area=None, model='cnocr') -> dict:
+        """
+        Search several texts with one OCR pass.
+
+        Args:
+            texts (list[str]):
+            interval (int, float): Interval of each text, as in appear_text().
+            area (tuple):
+            model (str):
+
+        Returns:
+            dict: Text to its location, or False if not appeared.
+        """
+        out = dict.fromkeys(texts, False)
+        queries = [text for text in texts if not interval or self._text_interval_reached(text, interval)]
+        if not queries:
+            return out
+
+        res = self.ocr_frame(area=area, model=model)
+        for text in queries:
+            location = self.device.get_location(text, res)
+            if location:
+                if interval:
+                    self.interval_timer[text].reset()
+                out[text] = location
+        return out
+
+    def appear_text(self, text, interval=0, area=None, model='cnocr') -> bool or tuple:
+        if interval and not self._text_interval_reached(text, interval):
+            return False
 
-        res = self.ocr_models.__getattribute__(model).ocr(self.device.image, area=area)
+        res = self.ocr_frame(area=area, model=model)
         location = self.device.get_location(text, res)
         if location:
             if interval:
@@ -161,16 +279,19 @@ class ModuleBase:
         #     self.interval_timer[button.name] = Timer(3).reset()
 
     def ensure_sroll(self, x1=(360, 460), x2=(360, 900), count=2, delay=1.5):
-        for i in range(count):
-            self.device.swipe(x1, x2, handle_control_check=False)
-            self.device.sleep(delay)
+        with self.device.minitouch_batch():
+            for i in range(count):
+                self.device.swipe(x1, x2, handle_control_check=False)
+                self.device.minitouch_delay(delay)
 
     def ensure_sroll_to_top(self, x1=(360, 460), x2=(360, 900), count=2, delay=1.5):
-        for i in range(count):
-            self.device.swipe(x1, x2, handle_control_check=False)
-            self.device.sleep(delay)
+        with self.device.minitouch_batch():
+            for i in range(count):
+                self.device.swipe(x1, x2, handle_control_check=False)
+                self.device.minitouch_delay(delay)
 
     def ensure_sroll_to_bottom(self, x1=(360, 900), x2=(360, 460), count=2, delay=1.5):
-        for i in range(count):
-            self.device.swipe(x1, x2, handle_control_check=False)
-            self.device.sleep(delay)
+        with self.device.minitouch_batch():
+            for i in range(count):
+                self.device.swipe(x1, x2, handle_control_check=False)
+                self.device.minitouch_delay(delay)
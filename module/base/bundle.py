@@ -0,0 +1,234 @@
+import hashlib
+import os
+from functools import cached_property
+
+import imageio
+import numpy as np
+from filelock import FileLock
+
+from module.base.utils import crop, load_image
+from module.config import server
+from module.config.utils import read_file, write_file
+from module.logger import logger
+
+BUNDLE_FOLDER = './bin/asset_bundle'
+# Align each template in bundle file
+ALIGNMENT = 64
+
+
+def load_template(file, area):
+    """
+    Decode an asset file and crop it.
+
+    Args:
+        file (str):
+        area (tuple):
+
+    Returns:
+        np.ndarray: Template, or list[np.ndarray] if file is a gif.
+    """
+    if os.path.splitext(file)[1] == '.gif':
+        images = []
+        for image in imageio.mimread(file):
+            image = image[:, :, :3].copy() if len(image.shape) == 3 else image
+            images.append(crop(image, area))
+        return images
+    else:
+        return load_image(file, area)
+
+
+def file_hash(file):
+    with open(file, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def asset_key(file, area):
+    return f'{file}|{",".join(str(int(x)) for x in area)}'
+
+
+def iter_button_assets(s):
+    """
+    Import all assets.py and yield their buttons.
+
+    Args:
+        s (str): Server
+
+    Yields:
+        str, tuple: file, area
+    """
+    from module.base.button import Button
+    from module.base.resource import Resource, import_all_assets
+
+    import_all_assets()
+    visited = set()
+    for obj in list(Resource.instances.values()):
+        if not isinstance(obj, Button) or not obj.raw_file:
+            continue
+        file, area = obj.parse_property(obj.raw_file, s), obj.parse_property(obj.raw_area, s)
+        key = asset_key(file, area)
+        if key not in visited and os.path.exists(file):
+            visited.add(key)
+            yield file, area
+
+
+def build_bundle(s):
+    """
+    Pack all the cropped templates of a server into one binary file.
+    Bundle file is named by its content hash, so processes mapping the old bundle are not affected.
+
+    Args:
+        s (str): Server
+
+    Returns:
+        dict: Index of the new bundle.
+    """
+    logger.hr(f'Build asset bundle: {s}')
+    os.makedirs(BUNDLE_FOLDER, exist_ok=True)
+    assets = {}
+    chunks = []
+    offset = 0
+    digest = hashlib.sha1()
+    for file, area in sorted(iter_button_assets(s)):
+        key = asset_key(file, area)
+        images = load_template(file, area)
+        images = images if isinstance(images, list) else [images]
+        frames = []
+        for image in images:
+            image = np.ascontiguousarray(image, dtype=np.uint8)
+            padding = -offset % ALIGNMENT
+            chunks.append(b'\x00' * padding)
+            offset += padding
+            frames.append({'offset': offset, 'shape': list(image.shape)})
+            chunks.append(image.tobytes())
+            offset += image.nbytes
+        stat = os.stat(file)
+        sha1 = file_hash(file)
+        digest.update(f'{key}|{sha1}'.encode())
+        assets[key] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha1': sha1,
+                       'gif': file.endswith('.gif'), 'frames': frames}
+
+    bundle = f'{s}.{digest.hexdigest()[:16]}.bundle'
+    with open(os.path.join(BUNDLE_FOLDER, bundle), 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    index = {'bundle': bundle, 'assets': assets}
+    write_file(os.path.join(BUNDLE_FOLDER, f'{s}.json'), index)
+    logger.info(f'Packed {len(assets)} assets into {bundle}, {round(offset / 1024 / 1024, 2)} MB')
+
+    # Remove old bundles, ignore those still mapped by other processes
+    for file in os.listdir(BUNDLE_FOLDER):
+        if file.startswith(f'{s}.') and file.endswith('.bundle') and file != bundle:
+            try:
+                os.remove(os.path.join(BUNDLE_FOLDER, file))
+            except OSError:
+                pass
+    return index
+
+
+class AssetBundle:
+    def __init__(self, s):
+        """
+        Read-only, memory-mapped templates of a server, built by build_bundle().
+        Pages are shared across all NKAS processes on the host.
+
+        Args:
+            s (str): Server
+        """
+        self.server = s
+
+    @cached_property
+    def index(self):
+        """
+        Load index, rebuild the bundle if it's missing, or any asset is added, removed or changed.
+
+        Returns:
+            dict:
+        """
+        os.makedirs(BUNDLE_FOLDER, exist_ok=True)
+        file = os.path.join(BUNDLE_FOLDER, f'{self.server}.json')
+        with FileLock(os.path.join(BUNDLE_FOLDER, f'{self.server}.build.lock')):
+            index = read_file(file)
+            if not self.is_valid(index):
+                index = build_bundle(self.server)
+        return index
+
+    def is_valid(self, index):
+        """
+        Args:
+            index (dict):
+
+        Returns:
+            bool: If bundle file exists, it has the same assets as assets.py, and all of them are unchanged.
+                File size and mtime are checked first, content hash only when they differ.
+        """
+        if not index or not os.path.exists(os.path.join(BUNDLE_FOLDER, index.get('bundle', ''))):
+            return False
+        # New Button assets have no entry to check, compare with the assets in assets.py
+        assets = set(asset_key(file, area) for file, area in iter_button_assets(self.server))
+        indexed = set(index.get('assets', {}))
+        if assets != indexed:
+            logger.info(f'Assets changed: {len(assets - indexed)} added, {len(indexed - assets)} removed')
+            return False
+        for key, entry in index.get('assets', {}).items():
+            file = key.split('|')[0]
+            try:
+                stat = os.stat(file)
+            except FileNotFoundError:
+                return False
+            if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime']:
+                continue
+            if file_hash(file) != entry['sha1']:
+                logger.info(f'Asset changed: {file}')
+                return False
+        return True
+
+    @cached_property
+    def data(self):
+        return np.memmap(os.path.join(BUNDLE_FOLDER, self.index['bundle']), dtype=np.uint8, mode='r')
+
+    def get(self, file, area):
+        """
+        Args:
+            file (str):
+            area (tuple):
+
+        Returns:
+            np.ndarray: Read-only template, or list[np.ndarray] if file is a gif,
+                or None if it's not in bundle.
+        """
+        entry = self.index.get('assets', {}).get(asset_key(file, area))
+        if entry is None:
+            return None
+        images = [np.ndarray(shape=frame['shape'], dtype=np.uint8, buffer=self.data, offset=frame['offset'])
+                  for frame in entry['frames']]
+        return images if entry['gif'] else images[0]
+
+
+_bundles = {}
+
+
+def get_template(file, area):
+    """
+    Get a cropped template, from asset bundle if possible.
+
+    Args:
+        file (str):
+        area (tuple):
+
+    Returns:
+        np.ndarray: Template, or list[np.ndarray] if file is a gif.
+    """
+    if server.server not in _bundles:
+        _bundles[server.server] = AssetBundle(server.server)
+    bundle = _bundles[server.server]
+
+    image = None
+    if bundle is not None:
+        try:
+            image = bundle.get(file, area)
+        except Exception as e:
+            logger.warning(f'Asset bundle unavailable, load assets from files: {e}')
+            _bundles[server.server] = None
+    if image is None:
+        image = load_template(file, area)
+    return image
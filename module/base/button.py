@@ -2,14 +2,22 @@ import os
 from functools import cached_property
 
 import cv2
-import imageio
 import numpy as np
 
+from module.base.bundle import get_template
+from module.base.frame import FRAME_CACHE
 from module.base.resource import Resource
-from module.base.utils import crop, load_image, area_offset, color_similar, get_color, mask_area, find_center
+from module.base.tracker import LOCATION_TRACKER
+from module.base.utils import crop, area_offset, color_similar, get_color, find_center, get_colors, \
+    color_tolerance
 
 
 class Button(Resource):
+    # Default color tolerance of the prefilter in match(), see Button._prefilter()
+    # Disabled by default, mean color changes with brightness but TM_CCOEFF_NORMED doesn't,
+    # so it's enabled per button after checking dev_tools/prefilter_benchmark.py, such as Page.CHECK_PREFILTER
+    PREFILTER = 0
+
     def __init__(self, area, color, button, file=None, name=None):
         """Initialize a Button instance.
 
@@ -36,12 +44,21 @@ class Button(Resource):
 
         # 非模板位置，例如'确认'并不是固定的
         self._button_offset = None
+        # Similarity of the last match()
+        self.similarity = 0.
         self._match_init = False
         self._match_binary_init = False
         self._match_luma_init = False
         self.image = None
         self.image_binary = None
         self.image_luma = None
+        # Coarse-to-fine matching, 0 to disable, 2 or 4 to search at 1/2 or 1/4 scale in grayscale first.
+        # Check dev_tools/pyramid_benchmark.py before enabling it on a button.
+        self.pyramid = 0
+        self._pyramid_templates = {}
+        # Color tolerance of the prefilter, None to use Button.PREFILTER, 0 to disable.
+        # Increase it on buttons whose color changes but still need to be matched, like highlighted ones.
+        self.prefilter = None
 
         if self.file:
             self.resource_add(key=self.file)
@@ -94,39 +111,230 @@ class Button(Resource):
 
     def ensure_template(self):
         """
-        Load asset image.
+        Load asset image, from the memory-mapped asset bundle if possible.
         If needs to call self.match, call this first.
         """
         if not self._match_init:
-            if self.is_gif:
-                self.image = []
-                for image in imageio.mimread(self.file):
-                    image = image[:, :, :3].copy() if len(image.shape) == 3 else image
-                    image = crop(image, self.area)
-                    self.image.append(image)
-            else:
-                self.image = load_image(self.file, self.area)
+            self.image = get_template(self.file, self.area)
             self._match_init = True
 
-    def match(self, image, offset=30, threshold=0.85, static=True) -> bool:
+    @staticmethod
+    def _parse_offset(offset):
+        """
+        Args:
+            offset (int, tuple): Int for vertical offset, (x, y) or (x1, y1, x2, y2).
+
+        Returns:
+            np.ndarray: (x1, y1, x2, y2)
+        """
+        if isinstance(offset, tuple):
+            if len(offset) == 2:
+                return np.array((-offset[0], -offset[1], offset[0], offset[1]))
+            else:
+                return np.array(offset)
+        else:
+            return np.array((-3, -offset, 3, offset))
+
+    def match_similarity(self, image, offset=30, static=True, pyramid=None):
+        """
+        Get the best similarity of template matching, threshold is not applied.
+        Results are cached within the same screenshot.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            offset (int, tuple): Search offset when static=True.
+            static (bool): False to search the whole image.
+            pyramid (int): Scale of coarse-to-fine matching, 0 to disable. None to use self.pyramid.
+
+        Returns:
+            float, tuple: Similarity, and upper left of the best match relative to the search window.
+        """
         self.ensure_template()
+        pyramid = self.pyramid if pyramid is None else pyramid
+        key = ('match', self, tuple(self._parse_offset(offset).tolist()) if static else None, pyramid)
+        result = FRAME_CACHE.get(image, key)
+        if result is not None:
+            return result
+
         if static:
-            if isinstance(offset, tuple):
-                if len(offset) == 2:
-                    offset = np.array((-offset[0], -offset[1], offset[0], offset[1]))
-                else:
-                    offset = np.array(offset)
-            else:
-                offset = np.array((-3, -offset, 3, offset))
+            search_area = self._parse_offset(offset) + self.area
+        else:
+            search_area = (0, 0, image.shape[1], image.shape[0])
+        if static and not self._prefilter(image, search_area):
+            return FRAME_CACHE.set(image, key, (0., (0, 0)))
 
-            image = crop(image, offset + self.area)
+        search = crop(image, search_area) if static else image
+        result = self._match_pyramid(search, scale=pyramid) if pyramid else None
+        if result is None:
+            res = cv2.matchTemplate(self.image, search, cv2.TM_CCOEFF_NORMED)
+            _, similarity, _, upper_left = cv2.minMaxLoc(res)
+            result = (similarity, upper_left)
 
-        res = cv2.matchTemplate(self.image, image, cv2.TM_CCOEFF_NORMED)
-        _, similarity, _, upper_left = cv2.minMaxLoc(res)
+        return FRAME_CACHE.set(image, key, result)
+
+    def _prefilter(self, image, search_area):
+        """
+        Cheap check before template matching.
+        Mean colors of all the template positions in search area are calculated on the integral image,
+        if none of them is close to self.color, the button can't be there.
+
+        Only works on the current screenshot, whose integral image is shared by all buttons.
+        Only used on static searches, on the whole screen it's an int64 pass over every position,
+        not cheaper than matching.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            search_area (tuple): (x1, y1, x2, y2) to search.
+
+        Returns:
+            bool: False if the button is surely not in search area.
+        """
+        tolerance = Button.PREFILTER if self.prefilter is None else self.prefilter
+        if not tolerance or self.color is None:
+            return True
+        integral = FRAME_CACHE.integral(image, force=True)
+        if integral is None:
+            return True
+        distance = self.color_distance(image, search_area, integral)
+        if distance is None:
+            return True
+
+        passed = bool(distance <= tolerance)
+        FRAME_CACHE.prefilter_record(passed)
+        return passed
+
+    def color_distance(self, image, search_area, integral):
+        """
+        Args:
+            image (np.ndarray): Screenshot.
+            search_area (tuple): (x1, y1, x2, y2) to search.
+            integral (np.ndarray): Output of cv2.integral() on image.
+
+        Returns:
+            float: Lowest color tolerance between self.color and the mean colors of all the template positions
+                in search area, the same as color_similar(). Positions partially outside of image are ignored.
+                None if search area is smaller than the button.
+        """
+        height, width = image.shape[:2]
+        h, w = self.area[3] - self.area[1], self.area[2] - self.area[0]
+        # Range of upper left
+        x1, y1 = max(int(search_area[0]), 0), max(int(search_area[1]), 0)
+        x2, y2 = min(int(search_area[2]), width) - w, min(int(search_area[3]), height) - h
+        if x2 < x1 or y2 < y1:
+            return None
+
+        sums = integral[y1 + h:y2 + h + 1, x1 + w:x2 + w + 1] - integral[y1:y2 + 1, x1 + w:x2 + w + 1] \
+               - integral[y1 + h:y2 + h + 1, x1:x2 + 1] + integral[y1:y2 + 1, x1:x2 + 1]
+        # color_tolerance() on sums, channel by channel, reducing on the last axis of size 3 is a lot slower
+        r, g, b = [sums[:, :, channel] - self.color[channel] * w * h for channel in range(3)]
+        tolerance = np.maximum(np.maximum(r, g), np.maximum(b, 0)) - np.minimum(np.minimum(r, g), np.minimum(b, 0))
+        return tolerance.min() / (w * h)
+
+    def _pyramid_template(self, scale):
+        """
+        Returns:
+            np.ndarray: Grayscale template downscaled by `scale`, cached per button.
+        """
+        if scale not in self._pyramid_templates:
+            gray = cv2.cvtColor(self.image, cv2.COLOR_RGB2GRAY)
+            self._pyramid_templates[scale] = cv2.resize(
+                gray, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+        return self._pyramid_templates[scale]
+
+    @staticmethod
+    def _pyramid_image(image, scale):
+        """
+        Returns:
+            np.ndarray: Grayscale image downscaled by `scale`, shared by all buttons on the same screenshot.
+        """
+        key = ('pyramid', scale)
+        small = FRAME_CACHE.get(image, key)
+        if small is None:
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            small = cv2.resize(gray, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+            FRAME_CACHE.set(image, key, small)
+        return small
+
+    def _match_pyramid(self, image, scale, candidates=3):
+        """
+        Coarse-to-fine template matching.
+        Search at 1/scale in grayscale, then refine the best candidates in small full resolution windows.
+
+        Args:
+            image (np.ndarray): Image to search.
+            scale (int): 2 or 4.
+            candidates (int): Amount of peaks on the coarse response to be refined.
+
+        Returns:
+            float, tuple: Similarity, and upper left of the best match relative to image.
+                None if template is too small to be downscaled.
+        """
+        template = self._pyramid_template(scale)
+        small = self._pyramid_image(image, scale)
+        th, tw = template.shape[:2]
+        if th < 8 or tw < 8 or small.shape[0] < th or small.shape[1] < tw:
+            return None
+
+        res = cv2.matchTemplate(template, small, cv2.TM_CCOEFF_NORMED)
+        h, w = self.image.shape[:2]
+        best = (-1., (0, 0))
+        for _ in range(candidates):
+            _, similarity, _, (x, y) = cv2.minMaxLoc(res)
+            if similarity <= -1:
+                break
+            res[max(y - th + 1, 0):y + th, max(x - tw + 1, 0):x + tw] = -1
+            # Position on coarse response has an error up to `scale` pixels
+            x1, y1 = max(x * scale - scale, 0), max(y * scale - scale, 0)
+            window = crop(image, (x1, y1, x1 + w + 2 * scale, y1 + h + 2 * scale))
+            _, similarity, _, (rx, ry) = cv2.minMaxLoc(cv2.matchTemplate(self.image, window, cv2.TM_CCOEFF_NORMED))
+            if similarity > best[0]:
+                best = (similarity, (x1 + rx, y1 + ry))
+
+        return best
+
+    def _match_tracked(self, image, threshold=0.85, pyramid=None):
+        """
+        Search the recent hit locations first, full image matching only if not found there.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            threshold (float):
+            pyramid (int):
+
+        Returns:
+            float, tuple: Similarity, and upper left of the best match.
+        """
+        self.ensure_template()
+        h, w = self.image.shape[:2]
+        margin = LOCATION_TRACKER.MARGIN
+        for x, y in LOCATION_TRACKER.get(self.file):
+            key = ('track', self, x, y)
+            result = FRAME_CACHE.get(image, key)
+            if result is None:
+                window = crop(image, (x - margin, y - margin, x + w + margin, y + h + margin))
+                res = cv2.matchTemplate(self.image, window, cv2.TM_CCOEFF_NORMED)
+                _, similarity, _, (rx, ry) = cv2.minMaxLoc(res)
+                result = FRAME_CACHE.set(image, key, (similarity, (x - margin + rx, y - margin + ry)))
+            if result[0] > threshold:
+                LOCATION_TRACKER.hit(self.file, result[1])
+                return result
+
+        similarity, upper_left = self.match_similarity(image, static=False, pyramid=pyramid)
+        LOCATION_TRACKER.miss(self.file, upper_left if similarity > threshold else None)
+        return similarity, upper_left
+
+    def match(self, image, offset=30, threshold=0.85, static=True, pyramid=None) -> bool:
+        # Remembered locations are screen coordinates, cropped or other images are matched as usual
+        if static or not self.file or not FRAME_CACHE.is_current(image):
+            similarity, upper_left = self.match_similarity(image, offset=offset, static=static, pyramid=pyramid)
+        else:
+            similarity, upper_left = self._match_tracked(image, threshold=threshold, pyramid=pyramid)
         # print(self.name, similarity)
+        self.similarity = similarity
 
         if similarity > threshold:
             if static:
+                offset = self._parse_offset(offset)
                 self._button_offset = area_offset(self._button, offset[:2] + np.array(upper_left))
             else:
                 h, w = self.area[3] - self.area[1], self.area[2] - self.area[0]
@@ -145,15 +353,43 @@ class Button(Resource):
         #     return False
         # else:
 
-    def match_several(self, image, offset=30, threshold=0.85, static=True) -> list[dict]:
-        # areas = set()
+    def match_several(self, image, offset=30, threshold=0.85, static=True, limit=None) -> list[dict]:
+        """
+        Find all the appearances of this button.
+        Template matching runs once, peaks above threshold are taken with non-maximum suppression.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            offset (int, tuple): Search offset when static=True.
+            threshold (float):
+            static (bool): False to search the whole image.
+            limit (int): Max amount of results, None for unlimited.
+
+        Returns:
+            list[dict]: [{'area': (x1, y1, x2, y2), 'location': (x, y)}], in descending order of similarity.
+        """
+        self.ensure_template()
+        if static:
+            offset = self._parse_offset(offset)
+            image = crop(image, offset + self.area)
+        res = cv2.matchTemplate(self.image, image, cv2.TM_CCOEFF_NORMED)
+        h, w = self.image.shape[:2]
+
         areas = []
-        while 1:
-            if self.match(image, offset=offset, threshold=threshold, static=static):
-                areas.append({'area': self._button_offset, 'location': self.location})
-                image = mask_area(image, self._button_offset)
+        while limit is None or len(areas) < limit:
+            _, similarity, _, upper_left = cv2.minMaxLoc(res)
+            if similarity <= threshold:
+                break
+            # Suppress all the positions whose template would overlap this one
+            x, y = upper_left
+            res[max(y - h + 1, 0):y + h, max(x - w + 1, 0):x + w] = -1
+            if static:
+                self._button_offset = area_offset(self._button, offset[:2] + np.array(upper_left))
             else:
-                return areas
+                self._button_offset = (x, y, x + w, y + h)
+            areas.append({'area': self._button_offset, 'location': self.location})
+
+        return areas
 
     def appear_on(self, image, threshold=10) -> bool:
         """Check if the button appears on the image.
@@ -166,7 +402,7 @@ class Button(Resource):
             bool: True if button appears on screenshot.
         """
         return color_similar(
-            color1=get_color(image, self.area),
+            color1=self.get_color(image, self.area),
             color2=self.color,
             threshold=threshold
         )
@@ -182,4 +418,41 @@ class Button(Resource):
         """
         diff = np.subtract(self.button, self._button)[:2]
         area = area_offset(self.area, offset=diff)
-        return color_similar(color1=get_color(image, area), color2=self.color, threshold=threshold)
+        return color_similar(color1=self.get_color(image, area), color2=self.color, threshold=threshold)
+
+    @staticmethod
+    def appear_on_many(image, buttons, threshold=10) -> list[bool]:
+        """Check if buttons appear on the image, in one vectorized step on the integral image.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            buttons (list[Button]):
+            threshold (int): Default to 10.
+
+        Returns:
+            list[bool]: Same as calling appear_on() on each button.
+        """
+        if not buttons:
+            return []
+        colors = get_colors(image, [button.area for button in buttons])
+        expected = [button.color for button in buttons]
+        return (color_tolerance(colors, expected) <= threshold).tolist()
+
+    @staticmethod
+    def get_color(image, area):
+        """
+        get_color() with results cached within the same screenshot.
+        Buttons on the same area share the result.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            area (tuple): (upper_left_x, upper_left_y, bottom_right_x, bottom_right_y)
+
+        Returns:
+            tuple: (r, g, b)
+        """
+        key = ('color', tuple(int(round(x)) for x in area))
+        color = FRAME_CACHE.get(image, key)
+        if color is not None:
+            return color
+        return FRAME_CACHE.set(image, key, get_color(image, area))
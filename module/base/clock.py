@@ -0,0 +1,64 @@
+import time
+from datetime import datetime
+
+
+class Clock:
+    """
+    Source of time for Timer, device sleeps and the scheduler.
+
+    Real by default. In virtual mode, time only moves on sleep() or advance(),
+    so a week of scheduling can be simulated in seconds.
+    Note that loops polling a Timer without sleeping never end in virtual mode.
+    """
+
+    def __init__(self):
+        # Current timestamp in virtual mode, None in real mode
+        self.virtual = None
+
+    def time(self):
+        """
+        Returns:
+            float: Same as time.time()
+        """
+        if self.virtual is None:
+            return time.time()
+        return self.virtual
+
+    def now(self):
+        """
+        Returns:
+            datetime: Same as datetime.now()
+        """
+        if self.virtual is None:
+            return datetime.now()
+        return datetime.fromtimestamp(self.virtual)
+
+    def sleep(self, second):
+        if self.virtual is None:
+            time.sleep(second)
+        elif second > 0:
+            self.virtual += second
+
+    def advance(self, second):
+        """
+        Fast-forward virtual time.
+        """
+        if self.virtual is not None and second > 0:
+            self.virtual += second
+
+    def set_virtual(self, start=None):
+        """
+        Args:
+            start (datetime, float): Virtual time to start from, default to now.
+        """
+        if start is None:
+            start = time.time()
+        elif isinstance(start, datetime):
+            start = start.timestamp()
+        self.virtual = float(start)
+
+    def set_real(self):
+        self.virtual = None
+
+
+CLOCK = Clock()
@@ -0,0 +1,123 @@
+import cv2
+
+
+class FrameCache:
+    """
+    Detection results of the current screenshot.
+
+    Each screenshot gets a frame id, results calculated on it are memoized until the next screenshot.
+    Results are only reused when the image passed in is exactly the current screenshot,
+    images being cropped or masked are always calculated.
+    """
+    # Build the integral image after this amount of area mean queries on one frame.
+    # Building costs about a few milliseconds, which isn't worth it for frames with one or two queries.
+    INTEGRAL_QUERIES = 4
+
+    def __init__(self):
+        self.frame_id = 0
+        self.image = None
+        self.results = {}
+        self._integral = None
+        self._integral_queries = 0
+
+        # Statistics since last show()
+        self.frames = 0
+        self.hit = 0
+        self.miss = 0
+        self.prefilter_pass = 0
+        self.prefilter_reject = 0
+
+    def new_frame(self, image):
+        """
+        Called by Screenshot.screenshot() when a new screenshot is taken.
+
+        Args:
+            image (np.ndarray):
+        """
+        self.frame_id += 1
+        self.frames += 1
+        self.image = image
+        self.results = {}
+        self._integral = None
+        self._integral_queries = 0
+
+    def is_current(self, image):
+        return image is not None and image is self.image
+
+    def get(self, image, key):
+        """
+        Args:
+            image (np.ndarray):
+            key (tuple): Hashable description of the calculation.
+
+        Returns:
+            Cached result, or None if not calculated on this frame.
+        """
+        if not self.is_current(image):
+            return None
+        result = self.results.get(key, None)
+        if result is None:
+            self.miss += 1
+        else:
+            self.hit += 1
+        return result
+
+    def set(self, image, key, result):
+        if self.is_current(image):
+            self.results[key] = result
+        return result
+
+    def integral(self, image, force=False):
+        """
+        Summed-area table of the current screenshot, built lazily.
+
+        Args:
+            image (np.ndarray):
+            force (bool): True to build it at first use.
+
+        Returns:
+            np.ndarray: Output of cv2.integral(), shape (height + 1, width + 1, channel),
+                or None if image is not the current screenshot or not worth building yet.
+        """
+        if not self.is_current(image):
+            return None
+        if self._integral is None:
+            self._integral_queries += 1
+            if not force and self._integral_queries < self.INTEGRAL_QUERIES:
+                return None
+            self._integral = cv2.integral(image)
+        return self._integral
+
+    def prefilter_record(self, passed):
+        """
+        Args:
+            passed (bool): Result of Button._prefilter()
+        """
+        if passed:
+            self.prefilter_pass += 1
+        else:
+            self.prefilter_reject += 1
+
+    def clear(self):
+        self.image = None
+        self.results = {}
+        self._integral = None
+        self._integral_queries = 0
+
+    def show(self):
+        from module.logger import logger
+        total = self.hit + self.miss
+        rate = self.hit / total if total else 0.
+        per_frame = self.hit / self.frames if self.frames else 0.
+        logger.attr('DetectionCache',
+                    f'frames={self.frames}, hit={self.hit}, miss={self.miss}, '
+                    f'hit_rate={round(rate * 100, 1)}%, saved_per_frame={round(per_frame, 2)}')
+        logger.attr('Prefilter', f'pass={self.prefilter_pass}, reject={self.prefilter_reject}')
+        self.frames = 0
+        self.hit = 0
+        self.miss = 0
+        self.prefilter_pass = 0
+        self.prefilter_reject = 0
+
+
+FRAME_CACHE = FrameCache()
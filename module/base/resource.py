@@ -1,3 +1,6 @@
+import importlib
+import os
+
 from module.base.decorator import del_cached_property
 from module.config import server
 
@@ -45,3 +48,13 @@ def release_resources(next_task=''):
         # if Resource.is_loaded(obj):
         #     logger.info(f'Release {obj}')
         obj.resource_release()
+
+
+def import_all_assets():
+    """
+    Import all assets.py under ./module, so all Buttons are recorded in Resource.instances.
+    """
+    for root, _, files in os.walk('./module'):
+        if 'assets.py' in files:
+            name = os.path.join(root, 'assets').replace('\\', '/').strip('./').replace('/', '.')
+            importlib.import_module(name)
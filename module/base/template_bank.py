@@ -0,0 +1,74 @@
+from module.base.button import Button
+
+
+class TemplateBank:
+    def __init__(self, buttons, name=None, pyramid=None):
+        """
+        A group of Buttons checked together against one screenshot,
+        such as popup confirms or rarity icons, which used to be checked one by one.
+
+        Template matching shares one preprocessing of the screenshot, the grayscale downscaled frame
+        of Button._match_pyramid() cached in FRAME_CACHE, then each button is matched on it
+        and only its candidates are refined in full resolution.
+        Color checks run as one vectorized step.
+
+        Args:
+            buttons (list[Button]):
+            name (str):
+            pyramid (int): Scale of the shared downscaled frame, 0 to match each button in full resolution,
+                None to use Button.pyramid. Check dev_tools/pyramid_benchmark.py before setting it.
+        """
+        self.buttons = list(buttons)
+        self.name = name if name else '|'.join([str(button) for button in self.buttons])
+        self.pyramid = pyramid
+
+    def __str__(self):
+        return self.name
+
+    def __iter__(self):
+        return iter(self.buttons)
+
+    def __len__(self):
+        return len(self.buttons)
+
+    def match(self, image, offset=30, threshold=0.85, static=True, buttons=None, first=False) -> list[dict]:
+        """
+        Template matching on all buttons.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            offset (int, tuple):
+            threshold (float):
+            static (bool):
+            buttons (list[Button]): Subset of buttons to check, None for all.
+            first (bool): True to stop at the first hit.
+
+        Returns:
+            list[dict]: [{'button': Button, 'similarity': float, 'area': tuple, 'location': tuple}]
+                of the buttons appeared, in the order of buttons.
+        """
+        buttons = self.buttons if buttons is None else buttons
+
+        hits = []
+        for button in buttons:
+            if button.match(image, offset=offset, threshold=threshold, static=static, pyramid=self.pyramid):
+                hits.append({'button': button, 'similarity': button.similarity,
+                             'area': button.button, 'location': button.location})
+                if first:
+                    break
+        return hits
+
+    def appear_on(self, image, threshold=10, buttons=None, first=False) -> list[dict]:
+        """
+        Color check on all buttons, in one vectorized step.
+        `first=True` returns the first hit only.
+
+        Returns:
+            list[dict]: [{'button': Button, 'area': tuple, 'location': tuple}]
+                of the buttons appeared, in the order of buttons.
+        """
+        buttons = self.buttons if buttons is None else buttons
+        appear = Button.appear_on_many(image, buttons, threshold=threshold)
+        hits = [{'button': button, 'area': button.button, 'location': button.location}
+                for button, a in zip(buttons, appear) if a]
+        return hits[:1] if first else hits
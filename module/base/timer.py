@@ -1,4 +1,4 @@
-import time
+from module.base.clock import CLOCK
 
 
 class Timer:
@@ -26,7 +26,7 @@ class Timer:
 
     def start(self):
         if not self.started():
-            self._current = time.time()
+            self._current = CLOCK.time()
             self._reach_count = 0
 
         return self
@@ -40,7 +40,7 @@ class Timer:
             float
         """
         if self.started():
-            return time.time() - self._current
+            return CLOCK.time() - self._current
         else:
             return 0.
 
@@ -51,10 +51,10 @@ class Timer:
         """
         if increase:
             self._reach_count += 1
-        return time.time() - self._current > self.limit and self._reach_count > self.count
+        return CLOCK.time() - self._current > self.limit and self._reach_count > self.count
 
     def reset(self):
-        self._current = time.time()
+        self._current = CLOCK.time()
         self._reach_count = 0
         return self
 
@@ -78,9 +78,9 @@ class Timer:
         """
         Wait until timer reached.
         """
-        diff = self._current + self.limit - time.time()
+        diff = self._current + self.limit - CLOCK.time()
         if diff > 0:
-            time.sleep(diff)
+            CLOCK.sleep(diff)
 
     def show(self):
         from module.logger import logger
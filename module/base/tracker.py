@@ -0,0 +1,108 @@
+from module.config.utils import read_file, write_file
+
+
+class LocationTracker:
+    """
+    Recent hit locations of non-static buttons, persisted across runs.
+
+    Buttons like CONFIRM_A usually appear on a few fixed places,
+    these places are searched first before a full image matching.
+    Only matches on the current screenshot are tracked, and learned locations are saved at task end in show().
+    """
+    FILE = './config/tmp/button_location.json'
+    # Locations to remember for each button
+    HISTORY = 3
+    # Search margin around a remembered location
+    MARGIN = 10
+
+    def __init__(self):
+        self._history = None
+        # If new locations are learned since last save()
+        self._dirty = False
+
+        # Statistics since last show()
+        self.fast_hit = 0
+        self.fallback = 0
+        self.fallback_hit = 0
+
+    @property
+    def history(self):
+        """
+        Returns:
+            dict: Key: button file, value: list of upper left, most recent first.
+        """
+        if self._history is None:
+            try:
+                self._history = read_file(self.FILE)
+            except Exception:
+                self._history = {}
+        return self._history
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Button file.
+
+        Returns:
+            list[list[int]]: Upper left of recent hits.
+        """
+        return self.history.get(key, [])
+
+    def hit(self, key, upper_left):
+        """
+        Called when button is found on a remembered location.
+        """
+        self.fast_hit += 1
+        self._record(key, upper_left)
+
+    def miss(self, key, upper_left=None):
+        """
+        Called when button is not found on any remembered location, and a full image matching was done.
+
+        Args:
+            key (str): Button file.
+            upper_left (tuple): Where full image matching found it, or None if not found.
+        """
+        self.fallback += 1
+        if upper_left is not None:
+            self.fallback_hit += 1
+            self._record(key, upper_left)
+
+    def _record(self, key, upper_left):
+        upper_left = [int(upper_left[0]), int(upper_left[1])]
+        history = self.get(key)
+        if history and history[0] == upper_left:
+            return
+        new = [upper_left] + [location for location in history if location != upper_left]
+        self.history[key] = new[:self.HISTORY]
+        # Save only when a new location is learned, reordering is kept in memory
+        if upper_left not in history:
+            self._dirty = True
+
+    def save(self):
+        """
+        Write learned locations into file, outside of matching.
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            write_file(self.FILE, self.history)
+        except Exception:
+            pass
+
+    def show(self):
+        from module.logger import logger
+        self.save()
+        # Of all the hits, how many are found on remembered locations
+        total = self.fast_hit + self.fallback_hit
+        rate = self.fast_hit / total if total else 0.
+        logger.attr('LocationTracker',
+                    f'fast_hit={self.fast_hit}, fallback={self.fallback}, fallback_hit={self.fallback_hit}, '
+                    f'fast_path_rate={round(rate * 100, 1)}%')
+        self.fast_hit = 0
+        self.fallback = 0
+        self.fallback_hit = 0
+
+
+LOCATION_TRACKER = LocationTracker()
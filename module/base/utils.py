@@ -5,6 +5,8 @@ import numpy as np
 from PIL import Image
 from filelock import FileLock
 
+from module.base.frame import FRAME_CACHE
+
 
 def random_normal_distribution_int(a, b, n=3):
     """Generate a normal distribution int within the interval. Use the average value of several random numbers to
@@ -199,6 +201,7 @@ def crop(image, area):
 
 def get_color(image, area):
     """Calculate the average color of a particular area of the image.
+    Use the integral image of current screenshot if it's available.
 
     Args:
         image (np.ndarray): Screenshot.
@@ -207,11 +210,42 @@ def get_color(image, area):
     Returns:
         tuple: (r, g, b)
     """
+    integral = FRAME_CACHE.integral(image)
+    if integral is not None:
+        return tuple(get_colors(image, [area], integral=integral)[0])
+
     temp = crop(image, area)
     color = cv2.mean(temp)
     return color[:3]
 
 
+def get_colors(image, areas, integral=None):
+    """Calculate the average colors of multiple areas in one pass, using the integral image.
+    Same as get_color(), area outside of image is considered black.
+
+    Args:
+        image (np.ndarray): Screenshot.
+        areas (np.ndarray, list[tuple]): Shape (n, 4),
+            (upper_left_x, upper_left_y, bottom_right_x, bottom_right_y)
+        integral (np.ndarray): Output of cv2.integral() to reuse.
+            If None, use the one of current screenshot, or build one.
+
+    Returns:
+        np.ndarray: Shape (n, 3), (r, g, b) of each area.
+    """
+    if integral is None:
+        integral = FRAME_CACHE.integral(image, force=True)
+    if integral is None:
+        integral = cv2.integral(image)
+    h, w = image.shape[:2]
+    areas = np.asarray(areas).round().astype(int)
+    x1, x2 = np.clip(areas[:, 0], 0, w), np.clip(areas[:, 2], 0, w)
+    y1, y2 = np.clip(areas[:, 1], 0, h), np.clip(areas[:, 3], 0, h)
+    sums = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+    size = (areas[:, 2] - areas[:, 0]) * (areas[:, 3] - areas[:, 1])
+    return sums[:, :3] / np.maximum(size, 1)[:, np.newaxis]
+
+
 def area_offset(area, offset):
     """
 
@@ -258,6 +292,20 @@ def color_similar(color1, color2, threshold=10):
     return diff <= threshold
 
 
+def color_tolerance(colors1, colors2):
+    """Vectorized tolerance of color_similar(), on the last axis.
+
+    Args:
+        colors1 (np.ndarray): Shape (..., 3)
+        colors2 (np.ndarray): Shape (..., 3)
+
+    Returns:
+        np.ndarray: Shape (...)
+    """
+    diff = np.asarray(colors1).astype(int) - np.asarray(colors2).astype(int)
+    return np.max(np.maximum(diff, 0), axis=-1) - np.min(np.minimum(diff, 0), axis=-1)
+
+
 def save_image(image, file):
     """
     Save an image like pillow.
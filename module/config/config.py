@@ -2,6 +2,7 @@ import copy
 import operator
 from datetime import datetime, timedelta
 
+from module.base.clock import CLOCK
 from module.base.filter import Filter
 from module.base.utils import ensure_time
 from module.config.config_generated import GeneratedConfig
@@ -155,7 +156,7 @@ class NikkeConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher):
         self.save()
 
     def config_override(self):
-        now = datetime.now().replace(microsecond=0)
+        now = CLOCK.now().replace(microsecond=0)
         limited = set()
 
         def limit_next_run(tasks, limit):
@@ -221,7 +222,7 @@ class NikkeConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher):
         pending = []
         waiting = []
         error = []
-        now = datetime.now()
+        now = CLOCK.now()
 
         # func 为json中的任务属性
         '''
@@ -313,7 +314,7 @@ class NikkeConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher):
                 if success
                 else self.Scheduler_FailureInterval
             )
-            run.append(datetime.now() + ensure_delta(interval))
+            run.append(CLOCK.now() + ensure_delta(interval))
         '''
             服务器更新时
         '''
@@ -328,7 +329,7 @@ class NikkeConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher):
             target = nearest_future(target)
             run.append(target)
         if minute is not None:
-            run.append(datetime.now() + ensure_delta(minute))
+            run.append(CLOCK.now() + ensure_delta(minute))
 
         if len(run):
             run = min(run).replace(microsecond=0)
@@ -357,7 +358,7 @@ class NikkeConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher):
 
         if force_call or self.is_task_enabled(task):
             logger.info(f"Task call: {task}")
-            self.modified[f"{task}.Scheduler.NextRun"] = datetime.now().replace(
+            self.modified[f"{task}.Scheduler.NextRun"] = CLOCK.now().replace(
                 microsecond=0
             )
             self.modified[f"{task}.Scheduler.Enable"] = True
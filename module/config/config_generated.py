@@ -20,10 +20,14 @@ class GeneratedConfig:
     # Group `Emulator`
     Emulator_Serial = 'auto'
     Emulator_PackageName = 'com_proximabeta_nikke'  # com_proximabeta_nikke, com_gamamobi_nikke
-    Emulator_ScreenshotMethod = 'DroidCast'  # DroidCast, ADB
+    Emulator_ScreenshotMethod = 'DroidCast'  # DroidCast, ADB, ADB_raw, auto
     Emulator_ControlMethod = 'minitouch'  # minitouch, ADB
     Emulator_AdbRestart = False
     Emulator_ScreenshotInterval = 0.5
+    Emulator_ScreenshotPrefetch = False
+    Emulator_ScreenshotAdaptive = False
+    Emulator_ScreenshotIntervalMin = 0.1
+    Emulator_ScreenshotIntervalMax = 2.0
     Emulator_AppStartClickX = 250
     Emulator_AppStartClickY = 615
     Emulator_ScheduleOffset = 0
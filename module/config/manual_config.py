@@ -63,12 +63,35 @@ class ManualConfig:
 
     FORWARD_PORT_RANGE = (20000, 21000)
 
+    # Send ADB input commands through one long-lived shell instead of a new session each time.
+    # It saves the shell session startup only, `input` is still started for each command.
+    # Check the gain with `python -m dev_tools.adb_input_benchmark` before enabling.
+    ADB_INPUT_CHANNEL = False
+    # Log minitouch commands on each send
+    MINITOUCH_LOG = False
+
+    # OCR models to load in background at scheduler start.
+    # cnocr is used by login and popup handlers, so all tasks need it.
+    OCR_PRELOAD = ['cnocr']
+    # 'pytorch' or 'onnx', ONNX models are exported by `python -m dev_tools.ocr_onnx_export`
+    OCR_BACKEND = 'pytorch'
+    # Threads of each ONNX session, 0 to let onnxruntime decide
+    OCR_THREADS = 0
+    # Use the shared OCR server started by `python -m module.ocr.server`,
+    # so instances on the same host don't load their own models
+    OCR_SERVER = False
+    OCR_SERVER_PORT = 22268
+
     BUTTON_OFFSET = 30
     BUTTON_MATCH_SIMILARITY = 0.74
     COLOR_SIMILAR_THRESHOLD = 10
 
     WAIT_BEFORE_SAVING_SCREEN_SHOT = 1
 
+    # Screenshot method `auto`, frames to take with each method, and how long the result is trusted
+    SCREENSHOT_AUTO_FRAMES = 5
+    SCREENSHOT_AUTO_EXPIRE = timedelta(hours=12)
+
     ASSETS_FOLDER = "./assets"
 
     DROIDCAST_FILEPATH_LOCAL = "./bin/DroidCast/DroidCast_raw-release-1.0.apk"
@@ -126,6 +149,9 @@ class ManualConfig:
     ]
 
     Error_ScreenshotLength = 1
+    # If length > 1, frames in history except the newest one are compressed, '.jpg', '.webp' or '.png'
+    Error_ScreenshotFormat = '.jpg'
+    Error_ScreenshotQuality = 90
 
     @property
     def SERVER(self):
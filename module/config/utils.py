@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 import yaml
 from filelock import FileLock
 
+from module.base.clock import CLOCK
 from module.config.atomicwrites import atomic_write
 
 LANGUAGES = ['zh-CN']
@@ -308,7 +309,7 @@ def get_server_next_update(daily_trigger, schedule_offset=0):
         用户时区差异
     '''
     diff = server_time_offset()
-    local_now = datetime.now()
+    local_now = CLOCK.now()
     trigger = []
 
     for t in daily_trigger:
@@ -0,0 +1,94 @@
+import time
+
+import numpy as np
+
+
+def is_blank(image, threshold=10):
+    """
+    Args:
+        image (np.ndarray):
+        threshold (int): Maximum color range of a blank image.
+
+    Returns:
+        bool: If image is a solid color, like the black screenshots of a broken backend.
+    """
+    # Check a downscaled copy, blank or not doesn't need every pixel
+    image = image[::8, ::8]
+    return int(image.max()) - int(image.min()) < threshold
+
+
+def benchmark_method(method, n=5, check=None):
+    """
+    Args:
+        method (callable): Screenshot method, returns np.ndarray.
+        n (int): Frames to take, not including a warm-up frame.
+        check (callable): Receives the image, raises or returns False if it's invalid.
+
+    Returns:
+        dict: {'cost': list[float], 'error': str or None, 'blank': int}
+    """
+    result = {'cost': [], 'error': None, 'blank': 0}
+    try:
+        # Warm up, connections and servers may need to start
+        method()
+        for _ in range(n):
+            start = time.perf_counter()
+            image = method()
+            result['cost'].append(time.perf_counter() - start)
+            if image is None or (check is not None and check(image) is False):
+                result['error'] = 'Invalid image'
+                return result
+            if is_blank(image):
+                result['blank'] += 1
+    # Including RequestHumanTakeover raised by retry wrappers
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    return result
+
+
+def percentile(cost):
+    """
+    Returns:
+        dict: {'p50': float, 'p95': float} in milliseconds.
+    """
+    if not cost:
+        return {'p50': None, 'p95': None}
+    cost = np.array(cost) * 1000
+    return {'p50': round(float(np.percentile(cost, 50)), 1), 'p95': round(float(np.percentile(cost, 95)), 1)}
+
+
+def choose_method(results):
+    """
+    Choose the fastest stable screenshot method.
+
+    A method is stable if it raised no error and all its frames were valid.
+    Methods giving only blank frames are dropped if another method gives real content,
+    since the game itself may be on a black screen.
+
+    Args:
+        results (dict): Key: method name, value: output of benchmark_method().
+
+    Returns:
+        str: Method name, or None if no method is stable.
+    """
+    stable = {name: result for name, result in results.items() if result['error'] is None and result['cost']}
+    content = {name: result for name, result in stable.items() if result['blank'] < len(result['cost'])}
+    if content:
+        stable = content
+    if not stable:
+        return None
+    return min(stable, key=lambda name: percentile(stable[name]['cost'])['p50'])
+
+
+def benchmark_screenshot_methods(methods, n=5, check=None):
+    """
+    Args:
+        methods (dict): Key: method name, value: callable.
+        n (int):
+        check (callable):
+
+    Returns:
+        str, dict: Chosen method, {name: benchmark_method() output}
+    """
+    results = {name: benchmark_method(method, n=n, check=check) for name, method in methods.items()}
+    return choose_method(results), results
@@ -1,12 +1,12 @@
 import logging
 import re
 import subprocess
-import time
 from functools import wraps
 
 import uiautomator2 as u2
 from adbutils import AdbError, AdbDevice, AdbClient, ForwardItem
 
+from module.base.clock import CLOCK
 from module.base.decorator import del_cached_property
 from module.base.utils import ensure_time
 from module.device.connection_attr import ConnectionAttr
@@ -81,6 +81,9 @@ class AdbDeviceWithStatus(AdbDevice):
 
 
 class Connection(ConnectionAttr):
+    # time.time() when the last touch event was sent, screenshots taken before it are outdated
+    input_time = 0.
+
     def __init__(self, config):
         """
            Args:
@@ -531,4 +534,4 @@ class Connection(ConnectionAttr):
         Args:
             second(int, float, tuple):
         """
-        time.sleep(ensure_time(second))
+        CLOCK.sleep(ensure_time(second))
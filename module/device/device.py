@@ -1,3 +1,4 @@
+import time
 from collections import deque
 
 from module.base.button import Button
@@ -173,6 +174,8 @@ class Device(Screenshot, Control, AppControl):
             启动NIKKE
         """
         super().app_start()
+        # Prefetched screenshots are outdated
+        self.input_time = time.time()
         self.stuck_record_clear()
         self.click_record_clear()
 
@@ -181,5 +184,7 @@ class Device(Screenshot, Control, AppControl):
             停止NIKKE
         """
         super().app_stop()
+        # Prefetched screenshots are outdated
+        self.input_time = time.time()
         self.stuck_record_clear()
         self.click_record_clear()
@@ -0,0 +1,110 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import cv2
+
+from module.base.utils import save_image
+from module.logger import logger
+
+# Writes error logs in background, so restarting the game is not blocked
+ERROR_DUMP = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ErrorDump')
+
+
+class ScreenshotHistory:
+    def __init__(self, length, ext='.jpg', quality=90):
+        """
+        Ring buffer of recent screenshots for error logs.
+        The newest frame is kept raw, older frames are compressed in a background thread.
+
+        Args:
+            length (int): Frames to keep.
+            ext (str): Compress format, '.jpg', '.webp' or '.png'.
+            quality (int): Quality of jpg and webp, 0 to 100. PNG always uses the fastest compression.
+        """
+        self.length = max(int(length), 1)
+        self.ext = ext
+        if ext == '.jpg':
+            self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        elif ext == '.webp':
+            self.params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+        else:
+            self.params = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+        # Each slot is a dict: {'time': datetime, 'image': np.ndarray or None, 'data': np.ndarray or None}
+        self._slots = [None] * self.length
+        self._index = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ScreenshotHistory')
+
+    def __len__(self):
+        return sum([1 for slot in self._slots if slot is not None])
+
+    def append(self, image, time=None):
+        """
+        Args:
+            image (np.ndarray): Screenshot in RGB.
+            time (datetime):
+        """
+        slot = {'time': time if time is not None else datetime.now(), 'image': image, 'data': None}
+        with self._lock:
+            prev = self._slots[self._index - 1]
+            self._slots[self._index] = slot
+            self._index = (self._index + 1) % self.length
+        if prev is not None and prev['data'] is None and self.length > 1:
+            self._executor.submit(self._compress, prev)
+
+    def _compress(self, slot):
+        image = slot['image']
+        if image is None:
+            return
+        success, data = cv2.imencode(self.ext, cv2.cvtColor(image, cv2.COLOR_RGB2BGR), self.params)
+        if success:
+            # Set data before dropping image, readers check image first
+            slot['data'] = data
+            slot['image'] = None
+
+    def snapshot(self):
+        """
+        Returns:
+            list[dict]: Slots from oldest to newest, frames are kept even if they are overwritten later.
+        """
+        with self._lock:
+            slots = self._slots[self._index:] + self._slots[:self._index]
+        return [dict(slot) for slot in slots if slot is not None]
+
+    def memory(self):
+        """
+        Returns:
+            int: Bytes used by frames.
+        """
+        size = 0
+        for slot in self._slots:
+            if slot is None:
+                continue
+            image, data = slot['image'], slot['data']
+            if image is not None:
+                size += image.nbytes
+            elif data is not None:
+                size += data.nbytes
+        return size
+
+    def save(self, slots, folder):
+        """
+        Args:
+            slots (list[dict]): Output of snapshot().
+            folder (str):
+        """
+        for slot in slots:
+            name = os.path.join(folder, datetime.strftime(slot['time'], '%Y-%m-%d_%H-%M-%S-%f'))
+            image, data = slot['image'], slot['data']
+            if image is not None:
+                save_image(image, f'{name}.png')
+            elif data is not None:
+                with open(f'{name}{self.ext}', 'wb') as f:
+                    f.write(data.tobytes())
+
+    def show(self):
+        logger.attr('ScreenshotHistory', f'frames={len(self)}/{self.length}, '
+                                         f'memory={round(self.memory() / 1024 / 1024, 2)}MB')
+
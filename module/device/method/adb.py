@@ -1,14 +1,29 @@
+import struct
+import time
+import zlib
+
 import cv2
 import numpy as np
 from functools import wraps
 
 from module.device.connection import Connection, retry
-from module.device.method.utils import ImageTruncated
+from module.device.method.utils import ImageTruncated, recv_all
 from module.exception import RequestHumanTakeover
 from module.logger import logger
 
 
+# PixelFormat of raw screencap, from android.graphics.PixelFormat
+SCREENCAP_FORMAT = {
+    1: cv2.COLOR_RGBA2RGB,  # RGBA_8888
+    2: cv2.COLOR_RGBA2RGB,  # RGBX_8888
+    5: cv2.COLOR_BGRA2RGB,  # BGRA_8888
+}
+
+
 class Adb(Connection):
+    # If raw screencap is compressed by gzip on device, None for not benchmarked yet
+    _screencap_compress = None
+
     @retry
     def screenshot_adb(self):
         """
@@ -43,3 +58,86 @@ class Adb(Connection):
         # it's already converted to RGB (3 channels), discarding the alpha channel
         
         return image
+
+    def _screencap_raw(self, compress=False):
+        """
+        Args:
+            compress (bool): True to compress by `gzip -1` on device,
+                less data to transfer but costs device CPU.
+
+        Returns:
+            np.ndarray: Screenshot in RGB format
+        """
+        if compress:
+            stream = self.adb_shell('screencap | gzip -1', stream=True, recvall=False)
+        else:
+            stream = self.adb_shell(['screencap'], stream=True, recvall=False)
+        # Raw screencap is 3.6MB, receive in larger chunks
+        data = recv_all(stream, chunk_size=262144)
+        if compress:
+            try:
+                data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+            except zlib.error as e:
+                # Probably `gzip: not found`
+                raise ImageTruncated(f'Failed to decompress screencap: {e}, {data[:100]}')
+
+        if len(data) < 16:
+            raise ImageTruncated(f'Empty image data from adb screencap: {data}')
+        width, height, pixel_format = struct.unpack_from('<III', data)
+        size = width * height * 4
+        # Header is 12 bytes, or 16 bytes on Android 9+ which has an extra color space
+        header = len(data) - size
+        if header not in [12, 16]:
+            # Old adb shell converts LF to CRLF in binary outputs
+            data = data.replace(b'\r\n', b'\n')
+            header = len(data) - size
+            if header not in [12, 16]:
+                raise ImageTruncated(f'Unexpected screencap size: {len(data)}, image {width}x{height}')
+        if pixel_format not in SCREENCAP_FORMAT:
+            raise ImageTruncated(f'Unsupported screencap pixel format: {pixel_format}')
+
+        image = np.frombuffer(data, dtype=np.uint8, count=size, offset=header).reshape((height, width, 4))
+        # Drop alpha in one pass, a strided view would make every cv2 call on it copy again
+        image = cv2.cvtColor(image, SCREENCAP_FORMAT[pixel_format])
+        return image
+
+    def screencap_benchmark(self, n=3):
+        """
+        Benchmark raw screencap with and without compression, and use the faster one.
+
+        Args:
+            n (int): Screenshots to take for each.
+
+        Returns:
+            bool: If compress.
+        """
+        logger.hr('Screencap benchmark')
+        cost = {}
+        for compress in [False, True]:
+            try:
+                self._screencap_raw(compress=compress)
+                start = time.perf_counter()
+                for _ in range(n):
+                    self._screencap_raw(compress=compress)
+                cost[compress] = (time.perf_counter() - start) / n
+                logger.info(f'Screencap compress={compress}: {round(cost[compress] * 1000, 1)}ms')
+            except ImageTruncated as e:
+                logger.info(f'Screencap compress={compress} unavailable: {e}')
+
+        compress = min(cost, key=cost.get) if cost else False
+        logger.attr('ScreencapCompress', compress)
+        self._screencap_compress = compress
+        return compress
+
+    @retry
+    def screenshot_adb_raw(self):
+        """
+        Take a screenshot using uncompressed screencap output, which skips PNG encoding on device and
+        decoding here.
+
+        Returns:
+            np.ndarray: Screenshot in RGB format (720x1280x3)
+        """
+        if self._screencap_compress is None:
+            self.screencap_benchmark()
+        return self._screencap_raw(compress=self._screencap_compress)
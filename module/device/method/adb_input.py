@@ -1,5 +1,6 @@
+import socket
 import time
-from functools import wraps
+from functools import cached_property, wraps
 
 from adbutils import AdbError
 
@@ -11,6 +12,10 @@ from module.exception import RequestHumanTakeover
 from module.logger import logger
 
 
+class AdbInputChannelBroken(Exception):
+    pass
+
+
 def retry(func):
     @wraps(func)
     def retry_wrapper(self, *args, **kwargs):
@@ -34,6 +39,12 @@ def retry(func):
 
                 def init():
                     self.adb_reconnect()
+            # Input channel died, open a new one
+            except AdbInputChannelBroken as e:
+                logger.error(e)
+
+                def init():
+                    pass
             # AdbError
             except AdbError as e:
                 if handle_adb_error(e):
@@ -56,7 +67,73 @@ def retry(func):
 
 class AdbInput(Connection):
     """ADB input commands for touch control and app management"""
-    
+    _adb_input_seq = 0
+
+    @cached_property
+    def adb_input_channel(self):
+        """
+        A long-lived `sh` on device, input commands are written into its stdin,
+        so each tap doesn't need to open an adb shell session.
+
+        Returns:
+            socket.socket:
+        """
+        logger.info('Adb input channel open')
+        stream = self.adb_shell(['sh'], stream=True, recvall=False)
+        conn = stream.conn
+        conn.settimeout(10)
+        return conn
+
+    def adb_input_channel_close(self):
+        conn = self.__dict__.get('adb_input_channel', None)
+        del_cached_property(self, 'adb_input_channel')
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def adb_input_send(self, cmd):
+        """
+        Run an input command, through the input channel if ADB_INPUT_CHANNEL is enabled.
+        Returns after the command finished on device, or when it's unknown if it did.
+
+        Args:
+            cmd (list[str]):
+
+        Raises:
+            AdbInputChannelBroken: If command was not written, so it's safe to retry.
+        """
+        if not self.config.ADB_INPUT_CHANNEL:
+            self.adb_shell(cmd)
+            return
+
+        self._adb_input_seq += 1
+        # Quoted in command, so the token can't be matched if the shell echos inputs
+        token = f'NKAS_INPUT_{self._adb_input_seq}\n'.encode()
+        command = f'{" ".join(cmd)}; echo NKAS_INPUT_"{self._adb_input_seq}"\n'.encode()
+        try:
+            conn = self.adb_input_channel
+            conn.sendall(command)
+        except (OSError, socket.timeout) as e:
+            # Command ends with a newline, sh doesn't run it unless it's fully written
+            self.adb_input_channel_close()
+            raise AdbInputChannelBroken(f'Adb input channel broken: {e}')
+
+        try:
+            received = b''
+            while token not in received:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    raise AdbInputChannelBroken('Adb input channel closed')
+                # Keep the tail only, in case token is split into two chunks
+                received = received[-len(token):] + chunk
+        except (OSError, socket.timeout, AdbInputChannelBroken) as e:
+            # Command was written and may have run, don't retry it, or the same tap is sent twice.
+            # Tasks check the screen again and click again if it didn't.
+            self.adb_input_channel_close()
+            logger.warning(f'Adb input channel broken after sending `{" ".join(cmd)}`: {e}')
+
     @retry
     def click_adb(self, x, y):
         """
@@ -68,9 +145,10 @@ class AdbInput(Connection):
         """
         x, y = ensure_int(x, y)
         cmd = ['input', 'tap', str(x), str(y)]
-        self.adb_shell(cmd)
+        self.adb_input_send(cmd)
         # Small delay to ensure click is registered
         time.sleep(0.05)
+        self.input_time = time.time()
     
     @retry
     def swipe_adb(self, p1, p2, duration=200):
@@ -85,9 +163,10 @@ class AdbInput(Connection):
         x1, y1 = ensure_int(p1[0], p1[1])
         x2, y2 = ensure_int(p2[0], p2[1])
         cmd = ['input', 'swipe', str(x1), str(y1), str(x2), str(y2), str(duration)]
-        self.adb_shell(cmd)
+        self.adb_input_send(cmd)
         # Small delay after swipe
         time.sleep(0.05)
+        self.input_time = time.time()
     
     @retry
     def drag_adb(self, p1, p2, duration=1000):
@@ -103,9 +182,10 @@ class AdbInput(Connection):
         x1, y1 = ensure_int(p1[0], p1[1])
         x2, y2 = ensure_int(p2[0], p2[1])
         cmd = ['input', 'swipe', str(x1), str(y1), str(x2), str(y2), str(duration)]
-        self.adb_shell(cmd)
+        self.adb_input_send(cmd)
         # Longer delay after drag
         time.sleep(0.5)
+        self.input_time = time.time()
     
     @retry
     def app_current_adb(self):
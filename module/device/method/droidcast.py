@@ -4,10 +4,12 @@ from functools import cached_property, wraps
 import cv2
 import numpy as np
 import requests
+import urllib3
 from adbutils import AdbError
 
 from module.base.decorator import del_cached_property
 from module.base.timer import Timer
+from module.device.method.rgb565 import Rgb565Decoder
 from module.device.method.uiautomator_2 import Uiautomator2, ProcessInfo
 from module.device.method.utils import RETRY_TRIES, retry_sleep, handle_adb_error, PackageNotInstalled, ImageTruncated
 from module.exception import RequestHumanTakeover
@@ -163,64 +165,42 @@ class DroidCast(Uiautomator2):
             if 'com.torther.droidcasts.Main' in proc.cmdline:
                 yield proc
 
+    @cached_property
+    def droidcast_decoder(self):
+        return Rgb565Decoder(width=720, height=1280)
+
     @retry
     def screenshot_droidcast_raw(self):
         self.config.DROIDCAST_VERSION = 'DroidCast_raw'
-        shape = (1280, 720)
-        image = self.droidcast_session.get(self.droidcast_raw_url(), timeout=3).content
-        # DroidCast_raw returns a RGB565 bitmap
-
+        decoder = self.droidcast_decoder
+        # Read response body into the preallocated buffer directly
         try:
-            arr = np.frombuffer(image, dtype=np.uint16)
-            arr = arr.reshape(shape)
-        except ValueError as e:
+            with self.droidcast_session.get(self.droidcast_raw_url(), timeout=3, stream=True) as resp:
+                size = decoder.readinto(resp.raw)
+                rest = resp.raw.read()
+        # Exceptions from urllib3 are not wrapped when reading resp.raw, wrap them as requests does
+        except urllib3.exceptions.ReadTimeoutError as e:
+            raise requests.exceptions.ReadTimeout(e)
+        except urllib3.exceptions.ProtocolError as e:
+            raise requests.exceptions.ConnectionError(e)
+
+        # DroidCast_raw returns a RGB565 bitmap
+        if size != decoder.raw.nbytes or rest:
+            image = decoder.raw.tobytes()[:size] + rest
             if len(image) < 500:
                 logger.warning(f'Unexpected screenshot: {image}')
             # Try to load as `DroidCast`
             image = np.frombuffer(image, np.uint8)
-            if image is not None:
+            if image.size:
                 image = cv2.imdecode(image, cv2.IMREAD_COLOR)
                 if image is not None:
                     raise DroidCastVersionIncompatible(
                         'Requesting screenshots from `DroidCast_raw` but server is `DroidCast`')
-            # ValueError: cannot reshape array of size 0 into shape (720,1280)
-            raise ImageTruncated(str(e))
-
-        # Convert RGB565 to RGB888
-        # https://blog.csdn.net/happy08god/article/details/10516871
-
-        # r = (arr & 0b1111100000000000) >> (11 - 3)
-        # g = (arr & 0b0000011111100000) >> (5 - 2)
-        # b = (arr & 0b0000000000011111) << 3
-        # r |= (r & 0b11100000) >> 5
-        # g |= (g & 0b11000000) >> 6
-        # b |= (b & 0b11100000) >> 5
-        # r = r.astype(np.uint8)
-        # g = g.astype(np.uint8)
-        # b = b.astype(np.uint8)
-        # image = cv2.merge([r, g, b])
-
-        # The same as the code above but costs about 3~4ms instead of 10ms.
-        # Note that cv2.convertScaleAbs is 5x fast as cv2.multiply, cv2.add is 8x fast as cv2.convertScaleAbs
-        # Note that cv2.convertScaleAbs includes rounding
-        r = cv2.bitwise_and(arr, 0b1111100000000000)
-        r = cv2.convertScaleAbs(r, alpha=0.00390625)
-        m = cv2.convertScaleAbs(r, alpha=0.03125)
-        cv2.add(r, m, dst=r)
-
-        g = cv2.bitwise_and(arr, 0b0000011111100000)
-        g = cv2.convertScaleAbs(g, alpha=0.125)
-        m = cv2.convertScaleAbs(g, alpha=0.015625, dst=m)
-        cv2.add(g, m, dst=g)
-
-        b = cv2.bitwise_and(arr, 0b0000000000011111)
-        b = cv2.convertScaleAbs(b, alpha=8)
-        m = cv2.convertScaleAbs(b, alpha=0.03125, dst=m)
-        cv2.add(b, m, dst=b)
-
-        image = cv2.merge([r, g, b])
+            raise ImageTruncated(f'Unexpected screenshot size: {size + len(rest)}')
 
-        return image
+        # Convert RGB565 to RGB888 with a lookup table, the same result as the cv2 arithmetic used before.
+        # Output is allocated for each frame, since screenshots are kept in screenshot_history.
+        return decoder.decode()
 
     @retry
     def screenshot_droidcast(self):
@@ -1,6 +1,7 @@
 import json
 import socket
 import time
+from contextlib import contextmanager
 from functools import cached_property, wraps
 from typing import List
 
@@ -110,63 +111,107 @@ def random_rho(dis):
     return random_normal_distribution(-dis, dis)
 
 
-def insert_swipe(p0, p3, speed=15, min_distance=10):
+def bezier_swipes(p0, p3, n=1, speed=15, min_distance=10):
     """
-    Insert way point from start to end.
-    First generate a cubic bézier curve
+    Generate `n` random swipe paths from start to end at once.
+    Each path is a cubic bézier curve with random control points,
+    and random `t` on it, sparse in the middle, dense at start and end.
 
     Args:
         p0: Start point.
         p3: End point.
+        n: Amount of paths.
         speed: Average move speed, pixels per 10ms.
-        min_distance:
+        min_distance: Points closer than this to the previous point or the start point are dropped.
 
     Returns:
-        list[list[int]]: List of points.
-
-    Examples:
-        > insert_swipe((400, 400), (600, 600), speed=20)
-        [[400, 400], [406, 406], [416, 415], [429, 428], [444, 442], [462, 459], [481, 478], [504, 500], [527, 522],
-        [545, 540], [560, 557], [573, 570], [584, 582], [592, 590], [597, 596], [600, 600]]
+        list[np.ndarray]: Paths in shape (N, 2), int.
     """
-    p0 = np.array(p0)
-    p3 = np.array(p3)
+    p0 = np.asarray(p0, dtype=float)
+    p3 = np.asarray(p3, dtype=float)
 
-    # Random control points in Bézier curve
+    # Random control points in Bézier curve, as random_theta() * random_rho() for each
     distance = np.linalg.norm(p3 - p0)
-    p1 = 2 / 3 * p0 + 1 / 3 * p3 + random_theta() * random_rho(distance * 0.1)
-    p2 = 1 / 3 * p0 + 2 / 3 * p3 + random_theta() * random_rho(distance * 0.1)
+    theta = np.random.uniform(0, 2 * np.pi, size=(n, 2))
+    rho = np.mean(np.random.uniform(-distance * 0.1, distance * 0.1, size=(n, 2, 5)), axis=2)
+    offset = np.stack([np.sin(theta), np.cos(theta)], axis=2) * rho[:, :, np.newaxis]
+    p1 = (2 / 3 * p0 + 1 / 3 * p3) + offset[:, 0]
+    p2 = (1 / 3 * p0 + 2 / 3 * p3) + offset[:, 1]
 
     # Random `t` on Bézier curve, sparse in the middle, dense at start and end
     segments = max(int(distance / speed) + 1, 5)
-    lower = random_normal_distribution(-85, -60)
-    upper = random_normal_distribution(80, 90)
-    theta = np.arange(lower + 0., upper + 0.0001, (upper - lower) / segments)
-    ts = np.sin(theta / 180 * np.pi)
-    ts = np.sign(ts) * abs(ts) ** 0.9
-    ts = (ts - min(ts)) / (max(ts) - min(ts))
-
-    # Generate cubic Bézier curve
-    points = []
-    prev = (-100, -100)
-    for t in ts:
-        point = p0 * (1 - t) ** 3 + 3 * p1 * t * (1 - t) ** 2 + 3 * p2 * t ** 2 * (1 - t) + p3 * t ** 3
-        point = point.astype(int).tolist()
-        if np.linalg.norm(np.subtract(point, prev)) < min_distance:
+    lower = np.mean(np.random.uniform(-85, -60, size=(n, 5)), axis=1)
+    upper = np.mean(np.random.uniform(80, 90, size=(n, 5)), axis=1)
+    angle = lower[:, np.newaxis] + (upper - lower)[:, np.newaxis] * np.linspace(0, 1, segments + 1)
+    ts = np.sin(angle / 180 * np.pi)
+    ts = np.sign(ts) * np.abs(ts) ** 0.9
+    ts_min = ts.min(axis=1, keepdims=True)
+    ts = (ts - ts_min) / (ts.max(axis=1, keepdims=True) - ts_min)
+
+    # Generate cubic Bézier curves, in shape (n, segments + 1, 2)
+    ts = ts[:, :, np.newaxis]
+    mt = 1 - ts
+    curves = p0 * mt ** 3 + 3 * p1[:, np.newaxis] * ts * mt ** 2 \
+             + 3 * p2[:, np.newaxis] * ts ** 2 * mt + p3 * ts ** 3
+    curves = curves.astype(int)
+
+    return [_drop_near_points(curve, min_distance) for curve in curves]
+
+
+def _drop_near_points(points, min_distance):
+    """
+    Drop points closer than `min_distance` to the previous kept point,
+    then drop points too close to the start point, same as the point by point generator.
+    """
+    kept = []
+    prev_x, prev_y = -100, -100
+    for x, y in points.tolist():
+        if (x - prev_x) ** 2 + (y - prev_y) ** 2 < min_distance ** 2:
             continue
+        kept.append([x, y])
+        prev_x, prev_y = x, y
+
+    path = np.array(kept)
+    if len(path) < 2:
+        return points[[0, -1]]
+    distance = np.linalg.norm(path[1:] - path[0], axis=1)
+    return path[np.append(True, distance > min_distance)]
 
-        points.append(point)
-        prev = point
 
-    # Delete nearing points
-    if len(points[1:]):
-        distance = np.linalg.norm(np.subtract(points[1:], points[0]), axis=1)
-        mask = np.append(True, distance > min_distance)
-        points = np.array(points)[mask].tolist()
-    else:
-        points = [p0, p3]
+# Paths generated at once for each swipe, see insert_swipe()
+SWIPE_POOL_SIZE = 8
+SWIPE_POOL_KEYS = 64
+_swipe_pool = {}
+
+
+def insert_swipe(p0, p3, speed=15, min_distance=10):
+    """
+    Insert way point from start to end.
+    Paths are generated by bezier_swipes() in batches and served one by one,
+    so repeating the same swipe, like ensure_sroll(), doesn't generate them every time.
+
+    Args:
+        p0: Start point.
+        p3: End point.
+        speed: Average move speed, pixels per 10ms.
+        min_distance:
+
+    Returns:
+        np.ndarray: Points in shape (N, 2), int.
 
-    return points
+    Examples:
+        > insert_swipe((400, 400), (600, 600), speed=20)
+        [[400 400] [406 406] [416 415] [429 428] [444 442] [462 459] [481 478] [504 500] [527 522]
+        [545 540] [560 557] [573 570] [584 582] [592 590] [600 600]]
+    """
+    key = (tuple(p0), tuple(p3), speed, min_distance)
+    pool = _swipe_pool.get(key)
+    if not pool:
+        if len(_swipe_pool) >= SWIPE_POOL_KEYS:
+            _swipe_pool.clear()
+        pool = bezier_swipes(p0, p3, n=SWIPE_POOL_SIZE, speed=speed, min_distance=min_distance)
+        _swipe_pool[key] = pool
+    return pool.pop()
 
 
 class Command:
@@ -241,6 +286,7 @@ class Command:
 
 class CommandBuilder:
     DEFAULT_DELAY = 0.05
+    BUFFER_SIZE = 4096
     max_x = 1280
     max_y = 720
 
@@ -250,8 +296,10 @@ class CommandBuilder:
             device:
         """
         self.device = device
-        self.commands = []
         self.delay = 0
+        # Serialized commands, written in place and reused between sends
+        self.buffer = bytearray(self.BUFFER_SIZE)
+        self.length = 0
 
     def convert(self, x, y):
         max_x, max_y = self.device.max_x, self.device.max_y
@@ -275,47 +323,77 @@ class CommandBuilder:
 
     def commit(self):
         """ add minitouch command: 'c\n' """
-        self.commands.append(Command('c'))
+        self._write(b'c\n')
         return self
 
     def reset(self):
         """ add minitouch command: 'r\n' """
-        self.commands.append(Command('r'))
+        self._write(b'r\n')
         return self
 
     def wait(self, ms=10):
         """ add minitouch command: 'w <ms>\n' """
-        self.commands.append(Command('w', ms=ms))
+        self._write(b'w %d\n' % ms)
         self.delay += ms
         return self
 
     def up(self, contact=0):
         """ add minitouch command: 'u <contact>\n' """
-        self.commands.append(Command('u', contact=contact))
+        self._write(b'u %d\n' % contact)
         return self
 
     def down(self, x, y, contact=0, pressure=100):
         """ add minitouch command: 'd <contact> <x> <y> <pressure>\n' """
         x, y = self.convert(x, y)
-        self.commands.append(Command('d', x=x, y=y, contact=contact, pressure=pressure))
+        self._write(b'd %d %d %d %d\n' % (contact, x, y, pressure))
         return self
 
     def move(self, x, y, contact=0, pressure=100):
         """ add minitouch command: 'm <contact> <x> <y> <pressure>\n' """
         x, y = self.convert(x, y)
-        self.commands.append(Command('m', x=x, y=y, contact=contact, pressure=pressure))
+        self._write(b'm %d %d %d %d\n' % (contact, x, y, pressure))
         return self
 
     def clear(self):
         """ clear current commands """
-        self.commands = []
         self.delay = 0
+        self.length = 0
+
+    def _write(self, data):
+        end = self.length + len(data)
+        if end > len(self.buffer):
+            self.buffer.extend(bytes(max(end - len(self.buffer), len(self.buffer))))
+        self.buffer[self.length:end] = data
+        self.length = end
+
+    def to_bytes(self) -> bytes:
+        """ bytes that write into minitouch socket """
+        return bytes(self.buffer[:self.length])
 
     def to_minitouch(self) -> str:
-        return ''.join([command.to_minitouch() for command in self.commands])
+        return self.buffer[:self.length].decode('utf-8')
+
+    def to_commands(self) -> List[Command]:
+        """
+        Parse serialized commands back to Command objects, for logging and atx-agent only,
+        so sending doesn't create them.
+        """
+        commands = []
+        for line in self.to_minitouch().splitlines():
+            operation, *args = line.split(' ')
+            args = [int(arg) for arg in args]
+            if operation in ['d', 'm']:
+                commands.append(Command(operation, contact=args[0], x=args[1], y=args[2], pressure=args[3]))
+            elif operation == 'u':
+                commands.append(Command(operation, contact=args[0]))
+            elif operation == 'w':
+                commands.append(Command(operation, ms=args[0]))
+            else:
+                commands.append(Command(operation))
+        return commands
 
     def to_atx_agent(self) -> List[str]:
-        return [command.to_atx_agent(self.max_x, self.max_y) for command in self.commands]
+        return [command.to_atx_agent(self.max_x, self.max_y) for command in self.to_commands()]
 
 
 class Minitouch(Connection):
@@ -325,6 +403,9 @@ class Minitouch(Connection):
     _minitouch_ws: websockets.WebSocketClientProtocol
     max_x: int
     max_y: int
+    # Depth of minitouch_batch(), and if gestures are queued in it
+    _minitouch_batch: int = 0
+    _minitouch_queued: bool = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -407,13 +488,84 @@ class Minitouch(Connection):
         )
 
     def minitouch_send(self):
-        content = self.minitouch_builder.to_minitouch()
-        # logger.info("send operation: {}".format(content.replace("\n", "\\n")))
-        byte_content = content.encode('utf-8')
-        self._minitouch_client.sendall(byte_content)
+        builder = self.minitouch_builder
+        if self._minitouch_batch:
+            # Device side wait instead of sleeping, so the next gesture keeps the same pace
+            builder.wait(int(builder.DEFAULT_DELAY * 1000))
+            self._minitouch_queued = True
+            return
+
+        self.minitouch_log(builder)
+        content = builder.to_bytes()
+        delay = builder.delay / 1000 + builder.DEFAULT_DELAY
+        builder.clear()
+        self._minitouch_write(content, delay)
+
+    @retry
+    def _minitouch_write(self, content, delay):
+        """
+        Args:
+            content (bytes): Serialized commands.
+            delay (float): Seconds to wait for the device to finish them.
+        """
+        # logger.info("send operation: {}".format(content.replace(b"\n", b"\\n")))
+        # Access builder to reconnect if the previous connection was dropped by retry
+        _ = self.minitouch_builder
+        self._minitouch_client.sendall(content)
         self._minitouch_client.recv(0)
-        time.sleep(self.minitouch_builder.delay / 1000 + self.minitouch_builder.DEFAULT_DELAY)
-        self.minitouch_builder.clear()
+        time.sleep(delay)
+        self.input_time = time.time()
+
+    def minitouch_log(self, builder):
+        """
+        Log commands to send if MINITOUCH_LOG is enabled.
+        """
+        if self.config.MINITOUCH_LOG:
+            logger.info(f'Minitouch send: {[command.to_minitouch().strip() for command in builder.to_commands()]}')
+
+    @contextmanager
+    def minitouch_batch(self):
+        """
+        Queue clicks and swipes, then send them in one socket write,
+        gaps between gestures are sent as minitouch wait commands.
+        Does nothing if control method is not minitouch.
+
+        Examples:
+            with self.device.minitouch_batch():
+                for _ in range(3):
+                    self.device.click_minitouch(360, 920)
+        """
+        if self.config.Emulator_ControlMethod != 'minitouch':
+            yield
+            return
+        self._minitouch_batch += 1
+        try:
+            yield
+        finally:
+            self._minitouch_batch -= 1
+            if not self._minitouch_batch:
+                self.minitouch_flush()
+
+    def minitouch_flush(self):
+        if not self._minitouch_queued:
+            return
+        self._minitouch_queued = False
+        builder = self.minitouch_builder
+        self.minitouch_log(builder)
+        content = builder.to_bytes()
+        # Gaps are already queued as wait commands
+        delay = builder.delay / 1000
+        builder.clear()
+        self._minitouch_write(content, delay)
+
+    def minitouch_delay(self, second):
+        """
+        Sleep between gestures. Inside a batch, it's queued as a wait command.
+        """
+        if self._minitouch_batch and self._minitouch_queued:
+            self.minitouch_builder.wait(int(second * 1000))
+        else:
+            self.sleep(second)
 
     @retry
     def click_minitouch(self, x, y):
@@ -449,7 +601,7 @@ class Minitouch(Connection):
             builder.move(*point).commit().wait(10)
         self.minitouch_send()
 
-        self.sleep(5)
+        self.minitouch_delay(5)
         builder.up().commit()
         self.minitouch_send()
 
@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+
+_lut = {}
+
+
+def rgb565_lut(bgr=False):
+    """
+    Lookup table from RGB565 to RGB888, the same result as the cv2 arithmetic converting
+    that used to be in DroidCast.screenshot_droidcast_raw().
+    Each 5/6 bit value is scaled up then added with its rounded high bits, saturated at 255.
+
+    Args:
+        bgr (bool): True to output BGR, for cv2.imwrite().
+
+    Returns:
+        np.ndarray: Shape (65536,), dtype uint32, each value is 4 bytes of R, G, B, 0 in memory.
+    """
+    if bgr in _lut:
+        return _lut[bgr]
+
+    value = np.arange(65536, dtype=np.uint32)
+    r = (value >> 11) << 3
+    g = ((value >> 5) & 0b111111) << 2
+    b = (value & 0b11111) << 3
+    # cv2.convertScaleAbs rounds half to even, so does np.rint
+    r = np.minimum(r + np.rint(r / 32), 255)
+    g = np.minimum(g + np.rint(g / 64), 255)
+    b = np.minimum(b + np.rint(b / 32), 255)
+
+    lut = np.zeros((65536, 4), dtype=np.uint8)
+    lut[:, 0], lut[:, 1], lut[:, 2] = (b, g, r) if bgr else (r, g, b)
+    lut = lut.view(np.uint32).ravel()
+    _lut[bgr] = lut
+    return lut
+
+
+class Rgb565Decoder:
+    def __init__(self, width=720, height=1280, bgr=False):
+        """
+        Decode RGB565 bitmaps with preallocated buffers.
+
+        Args:
+            width (int):
+            height (int):
+            bgr (bool): True to output BGR.
+        """
+        self.shape = (height, width)
+        self.bgr = bgr
+        self.lut = rgb565_lut(bgr)
+        # Raw RGB565 data, fill it with readinto()
+        self.raw = np.empty(self.shape, dtype=np.uint16)
+        self._rgbx = np.empty(self.shape, dtype=np.uint32)
+
+    def readinto(self, stream):
+        """
+        Read a RGB565 bitmap into self.raw without intermediate bytes objects.
+
+        Args:
+            stream: File-like object that has readinto(), such as `requests.Response.raw`.
+
+        Returns:
+            int: Bytes read, equals to self.raw.nbytes if the whole bitmap is received.
+        """
+        view = memoryview(self.raw).cast('B')
+        size = 0
+        while size < len(view):
+            n = stream.readinto(view[size:])
+            if not n:
+                break
+            size += n
+        return size
+
+    def decode(self, arr=None, out=None):
+        """
+        Args:
+            arr (np.ndarray): RGB565 bitmap in uint16, default to self.raw.
+            out (np.ndarray): Output buffer in shape (height, width, 3), allocate a new one if None.
+
+        Returns:
+            np.ndarray: RGB888 image, or BGR888 if self.bgr.
+        """
+        arr = self.raw if arr is None else arr
+        if arr.shape == self.shape:
+            rgbx = self._rgbx
+            # mode='clip' writes into `out` directly instead of buffering, indexes never exceed anyway
+            np.take(self.lut, arr, out=rgbx, mode='clip')
+        else:
+            rgbx = np.take(self.lut, arr, mode='clip')
+        rgbx = rgbx.view(np.uint8).reshape((*arr.shape, 4))
+        if out is None:
+            out = np.empty((*arr.shape, 3), dtype=np.uint8)
+        # Drop the padding byte, fixed channel order so no swap here
+        cv2.cvtColor(rgbx, cv2.COLOR_RGBA2RGB, dst=out)
+        return out
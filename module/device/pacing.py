@@ -0,0 +1,90 @@
+import time
+
+import cv2
+
+
+class ScreenshotPacer:
+    # Compare every 16th pixel of the green channel, 45x80 on a 720x1280 screenshot
+    DOWNSAMPLE = 16
+    # Mean difference of the downsampled frames to be considered as changing
+    CHANGE_THRESHOLD = 2.
+    # Screen keeps changing longer than this is an animation or a battle, not a transition,
+    # back off as if it's static.
+    CHANGE_LIMIT = 3.
+
+    def __init__(self, base, minimum, maximum):
+        """
+        Adaptive screenshot interval.
+        Interval is set to `minimum` right after an input or when screen starts changing,
+        and doubles on each static frame until `maximum`.
+
+        Args:
+            base (float): The fixed interval without pacing, to count screenshots saved.
+            minimum (float):
+            maximum (float):
+        """
+        self.base = base
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.current = minimum
+        self._prev = None
+        self._frame_time = 0.
+        self._change_start = None
+
+        # Statistics since last show()
+        self.frames = 0
+        self.saved = 0.
+
+    def interval(self, input_time=0.):
+        """
+        Args:
+            input_time (float): time.time() of the last input.
+
+        Returns:
+            float: Interval to wait before the next screenshot.
+        """
+        if input_time > self._frame_time:
+            return self.minimum
+        return self.current
+
+    def update(self, image, input_time=0.):
+        """
+        Called on each new screenshot.
+
+        Args:
+            image (np.ndarray):
+            input_time (float): time.time() of the last input.
+        """
+        now = time.time()
+        small = image[::self.DOWNSAMPLE, ::self.DOWNSAMPLE, 1]
+        changed = self._prev is not None and self._prev.shape == small.shape \
+            and cv2.absdiff(small, self._prev).mean() > self.CHANGE_THRESHOLD
+
+        # Compared to fixed interval, how many screenshots are saved by waiting this long
+        if self.frames:
+            self.saved += (now - self._frame_time) / self.base - 1 if self.base else 0.
+        self.frames += 1
+
+        if input_time > self._frame_time:
+            self._change_start = now if changed else None
+            self.current = self.minimum
+        elif changed:
+            if self._change_start is None:
+                self._change_start = now
+            if now - self._change_start < self.CHANGE_LIMIT:
+                self.current = self.minimum
+            else:
+                self.current = min(self.current * 2, self.maximum)
+        else:
+            self._change_start = None
+            self.current = min(self.current * 2, self.maximum)
+
+        self._prev = small
+        self._frame_time = now
+
+    def show(self):
+        from module.logger import logger
+        logger.attr('ScreenshotPacing', f'frames={self.frames}, saved={round(self.saved, 1)}, '
+                                        f'interval={round(self.current, 3)}s')
+        self.frames = 0
+        self.saved = 0.
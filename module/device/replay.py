@@ -0,0 +1,300 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+import cv2
+
+from module.base.decorator import del_cached_property
+from module.base.timer import Timer
+from module.config.utils import read_file, write_file
+from module.device.device import Device
+from module.logger import logger
+
+SESSION_FOLDER = './log/session'
+
+
+class ReplayEnd(Exception):
+    pass
+
+
+def _normalize(kind, args):
+    """
+    Convert arguments of input methods to json serializable coordinates.
+
+    Returns:
+        list: [x, y] for click, [[x1, y1], [x2, y2]] for swipe and drag, [] for others.
+    """
+    if kind == 'click':
+        if len(args) == 1 or args[1] is None:
+            args = args[0]
+        return [int(args[0]), int(args[1])]
+    if kind in ['swipe', 'drag']:
+        return [[int(args[0][0]), int(args[0][1])], [int(args[1][0]), int(args[1][1])]]
+    return []
+
+
+class SessionRecorder:
+    # Device method: event type. Only the outermost call is recorded when they call each other.
+    INPUTS = {
+        'click_coordinate': 'click',
+        'click_adb': 'click',
+        'swipe_coordinate': 'swipe',
+        'swipe_adb': 'swipe',
+        'drag_minitouch': 'drag',
+        'drag_adb': 'drag',
+        'app_start': 'app_start',
+        'app_stop': 'app_stop',
+    }
+
+    def __init__(self, device, folder=None):
+        """
+        Record screenshots and inputs of a live device into a session folder,
+        which can be replayed by ReplayDevice.
+
+        Frames are deduplicated by content and saved as PNG in background, so replaying gets the exact pixels.
+
+        Args:
+            device (Device):
+            folder (str): Default to ./log/session/<timestamp>
+        """
+        self.device = device
+        self.folder = folder if folder else os.path.join(SESSION_FOLDER, datetime.now().strftime('%Y%m%d_%H%M%S'))
+        self.events = []
+        self.frames = set()
+        self._start = 0.
+        self._depth = 0
+        self._executor = None
+
+    def start(self):
+        logger.info(f'Session record start: {self.folder}')
+        os.makedirs(os.path.join(self.folder, 'frames'), exist_ok=True)
+        self._start = time.time()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='SessionRecorder')
+        self.device.screenshot = self._wrap_screenshot(self.device.screenshot)
+        for name, kind in self.INPUTS.items():
+            setattr(self.device, name, self._wrap_input(getattr(self.device, name), kind))
+        # Rebuild with the wrapped methods
+        del_cached_property(self.device, 'click_methods')
+        return self
+
+    def stop(self):
+        for name in ['screenshot'] + list(self.INPUTS.keys()):
+            self.device.__dict__.pop(name, None)
+        del_cached_property(self.device, 'click_methods')
+        self._executor.shutdown(wait=True)
+        self.save()
+        logger.info(f'Session record stop: {len(self.events)} events, {len(self.frames)} unique frames')
+
+    def save(self):
+        write_file(os.path.join(self.folder, 'session.json'), {
+            'start': datetime.fromtimestamp(self._start).isoformat(),
+            'events': self.events,
+        })
+
+    def _wrap_screenshot(self, func):
+        def wrapper(*args, **kwargs):
+            image = func(*args, **kwargs)
+            key = hashlib.sha1(image.tobytes()).hexdigest()[:16]
+            if key not in self.frames:
+                self.frames.add(key)
+                self._executor.submit(self._save_frame, image, key)
+            self.events.append({'time': round(time.time() - self._start, 3), 'type': 'screenshot', 'frame': key})
+            return image
+
+        return wrapper
+
+    def _save_frame(self, image, key):
+        file = os.path.join(self.folder, 'frames', f'{key}.png')
+        cv2.imwrite(file, cv2.cvtColor(image, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_PNG_COMPRESSION, 1])
+
+    def _wrap_input(self, func, kind):
+        def wrapper(*args, **kwargs):
+            if self._depth:
+                return func(*args, **kwargs)
+            self._depth += 1
+            try:
+                self.events.append({'time': round(time.time() - self._start, 3), 'type': kind,
+                                    'args': _normalize(kind, args)})
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+
+        return wrapper
+
+
+@lru_cache(maxsize=32)
+def load_frame(file):
+    image = cv2.imread(file, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ReplayEnd(f'Frame missing: {file}')
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+class ReplayDevice(Device):
+    # Inputs within this distance of the recorded ones are considered the same
+    INPUT_TOLERANCE = 5
+    # Raise ReplayEnd after this amount of screenshots waiting for an input that never comes
+    STALL_LIMIT = 200
+
+    def __init__(self, config, folder, mode='click', speed=1.):
+        """
+        A Device that feeds frames of a recorded session instead of connecting to an emulator.
+
+        Args:
+            config (NikkeConfig):
+            folder (str): Session folder made by SessionRecorder.
+            mode (str): 'click' to advance over recorded frames on each screenshot until the next recorded input,
+                and jump over it when the script sends an input.
+                'clock' to show the frame recorded at the same elapsed time, inputs don't change frames.
+            speed (float): Playback speed in 'clock' mode.
+        """
+        # No super().__init__(), there's nothing to connect
+        self.config = config
+        self.serial = f'replay:{folder}'
+        self.package = self.config.Emulator_PackageName.replace('_', '.')
+        self.orientation = 0
+        self._screenshot_interval = Timer(0)
+
+        self.folder = folder
+        self.mode = mode
+        self.speed = speed
+        self.events = read_file(os.path.join(folder, 'session.json')).get('events', [])
+        if not self.events:
+            raise ReplayEnd(f'Empty session: {folder}')
+        # Cursor of events, and the screenshot event being served
+        self._index = -1
+        self._frame_index = next(i for i, event in enumerate(self.events) if event['type'] == 'screenshot')
+        self._start = time.time()
+        self._stall = 0
+
+        # Statistics
+        self.served = 0
+        self.matched = 0
+        self.mismatched = 0
+        logger.info(f'Replay session: {folder}, {len(self.events)} events, mode={mode}')
+
+    def _frame(self, index):
+        return load_frame(os.path.join(self.folder, 'frames', f'{self.events[index]["frame"]}.png'))
+
+    def _replay_screenshot(self):
+        if self.mode == 'clock':
+            elapsed = (time.time() - self._start) * self.speed
+            if elapsed > self.events[-1]['time']:
+                raise ReplayEnd('Session finished')
+            for index in range(max(self._index, 0), len(self.events)):
+                if self.events[index]['time'] > elapsed:
+                    break
+                self._index = index
+                if self.events[index]['type'] == 'screenshot':
+                    self._frame_index = index
+        else:
+            index = self._index + 1
+            if index >= len(self.events):
+                raise ReplayEnd('Session finished')
+            if self.events[index]['type'] == 'screenshot':
+                self._index = index
+                self._frame_index = index
+                self._stall = 0
+            else:
+                # Stay on the current frame, until the script does the recorded input
+                self._stall += 1
+                if self._stall > self.STALL_LIMIT:
+                    raise ReplayEnd(f'Script diverged, waiting for {self.events[index]}')
+
+        self.served += 1
+        return self._frame(self._frame_index)
+
+    def _replay_input(self, kind, args):
+        args = _normalize(kind, args)
+        for index in range(self._index + 1, len(self.events)):
+            event = self.events[index]
+            if event['type'] == 'screenshot':
+                continue
+            if event['type'] == kind and self._input_similar(kind, event['args'], args):
+                self.matched += 1
+            else:
+                self.mismatched += 1
+                logger.warning(f'Replay input mismatch: {kind} {args}, recorded {event["type"]} {event["args"]}')
+            if self.mode != 'clock':
+                self._index = index
+                self._stall = 0
+            break
+        else:
+            if self.mode != 'clock':
+                raise ReplayEnd(f'No recorded input left for {kind} {args}')
+        self.input_time = time.time()
+
+    def _input_similar(self, kind, recorded, args):
+        if kind == 'click':
+            recorded, args = [recorded], [args]
+        for p1, p2 in zip(recorded, args):
+            if abs(p1[0] - p2[0]) > self.INPUT_TOLERANCE or abs(p1[1] - p2[1]) > self.INPUT_TOLERANCE:
+                return False
+        return True
+
+    def replay_show(self):
+        logger.attr('Replay', f'frames={self.served}, input_matched={self.matched}, '
+                              f'input_mismatched={self.mismatched}')
+
+    """
+    Screenshot
+    """
+
+    def screenshot_method(self):
+        return self._replay_screenshot
+
+    def _screenshot_wait(self):
+        pass
+
+    """
+    Control
+    """
+
+    def click_coordinate(self, x, y=None):
+        self._replay_input('click', (x, y))
+
+    def swipe_coordinate(self, p1, p2):
+        self._replay_input('swipe', (p1, p2))
+
+    def click_adb(self, x, y):
+        self._replay_input('click', (x, y))
+
+    def swipe_adb(self, p1, p2, duration=200):
+        self._replay_input('swipe', (p1, p2))
+
+    def drag_adb(self, p1, p2, duration=1000):
+        self._replay_input('drag', (p1, p2))
+
+    def drag_minitouch(self, p1, p2):
+        self._replay_input('drag', (p1, p2))
+
+    def sleep(self, second):
+        # Frames only move on inputs in click mode, waiting is useless
+        if self.mode == 'clock':
+            super().sleep(second)
+
+    """
+    AppControl
+    """
+
+    def app_is_running(self) -> bool:
+        return True
+
+    def app_start(self):
+        self._replay_input('app_start', ())
+        self.stuck_record_clear()
+        self.click_record_clear()
+
+    def app_stop(self):
+        self._replay_input('app_stop', ())
+        self.stuck_record_clear()
+        self.click_record_clear()
+
+    def get_orientation(self):
+        return self.orientation
+
+    def adb_shell(self, cmd, stream=False, recvall=True, timeout=10, rstrip=True):
+        return b'' if stream else ''
@@ -1,11 +1,19 @@
-from collections import deque
+import threading
+import time
 from datetime import datetime
 from functools import cached_property
 
+from module.base.frame import FRAME_CACHE
 from module.base.timer import Timer
 from module.base.utils import image_size
+from module.config.utils import read_file, write_file
+from module.device.history import ScreenshotHistory
+from module.device.benchmark import benchmark_screenshot_methods, percentile
 from module.device.method.droidcast import DroidCast
 from module.device.method.adb import Adb
+from module.device.pacing import ScreenshotPacer
+from module.exception import RequestHumanTakeover
+from module.logger import logger
 
 
 class ScreenshotSizeError(Exception):
@@ -18,22 +26,114 @@ class ScreenshotMultiInheritance(DroidCast, Adb):
 
 
 class Screenshot(ScreenshotMultiInheritance):
+    # Results of `auto` screenshot method, key: serial
+    SCREENSHOT_AUTO_FILE = './config/tmp/screenshot_method.json'
+    _screenshot_auto_method: str = None
+    _screenshot_auto_time: datetime = None
+
     def __init__(self, config):
         super().__init__(config)
         self._screenshot_interval = Timer(
             float(self.config.Emulator_ScreenshotInterval)
         )
+        if self.config.Emulator_ScreenshotMethod == 'auto':
+            self.screenshot_method_auto()
 
     @cached_property
     def screenshot_methods(self):
         return {
             "DroidCast": self.screenshot_droidcast_raw,
             "ADB": self.screenshot_adb,
+            "ADB_raw": self.screenshot_adb_raw,
         }
 
+    def screenshot_method(self):
+        """
+        Returns:
+            callable: Screenshot method in use, with `auto` resolved.
+        """
+        method = self.config.Emulator_ScreenshotMethod
+        if method == 'auto':
+            if self._screenshot_auto_method is None \
+                    or datetime.now() - self._screenshot_auto_time > self.config.SCREENSHOT_AUTO_EXPIRE:
+                self.screenshot_method_auto()
+            method = self._screenshot_auto_method
+        return self.screenshot_methods.get(method)
+
+    def screenshot_method_auto(self, force=False):
+        """
+        Take frames with each screenshot method, and use the fastest stable one.
+        Result is cached for each serial and re-evaluated after SCREENSHOT_AUTO_EXPIRE.
+
+        Args:
+            force (bool): True to ignore cache.
+
+        Returns:
+            str: Method name.
+        """
+        try:
+            data = read_file(self.SCREENSHOT_AUTO_FILE)
+        except Exception:
+            data = {}
+        cache = data.get(self.serial, {})
+        if not force and cache.get('method') in self.screenshot_methods:
+            record = datetime.fromisoformat(cache['time'])
+            if datetime.now() - record < self.config.SCREENSHOT_AUTO_EXPIRE:
+                self._screenshot_auto_method = cache['method']
+                self._screenshot_auto_time = record
+                logger.attr('ScreenshotMethod', f'{cache["method"]} (auto, cached)')
+                return cache['method']
+
+        logger.hr('Screenshot method benchmark')
+        method, results = benchmark_screenshot_methods(
+            self.screenshot_methods, n=self.config.SCREENSHOT_AUTO_FRAMES, check=self._screenshot_check)
+        latency = {}
+        for name, result in results.items():
+            latency[name] = percentile(result['cost'])
+            logger.info(f'{name}: p50={latency[name]["p50"]}ms, p95={latency[name]["p95"]}ms, '
+                        f'blank={result["blank"]}, error={result["error"]}')
+        if method is None:
+            logger.critical('No screenshot method available')
+            raise RequestHumanTakeover
+        logger.attr('ScreenshotMethod', f'{method} (auto)')
+
+        self._screenshot_auto_method = method
+        self._screenshot_auto_time = datetime.now()
+        data[self.serial] = {'method': method, 'time': self._screenshot_auto_time.isoformat(), 'latency': latency}
+        try:
+            write_file(self.SCREENSHOT_AUTO_FILE, data)
+        except Exception as e:
+            logger.warning(f'Failed to save screenshot method: {e}')
+        return method
+
+    @staticmethod
+    def _screenshot_check(image):
+        return image_size(image) == (720, 1280)
+
     @cached_property
-    def screenshot_deque(self):
-        return deque(maxlen=int(self.config.Error_ScreenshotLength))
+    def screenshot_pacer(self):
+        return ScreenshotPacer(
+            base=float(self.config.Emulator_ScreenshotInterval),
+            minimum=float(self.config.Emulator_ScreenshotIntervalMin),
+            maximum=float(self.config.Emulator_ScreenshotIntervalMax),
+        )
+
+    def _screenshot_wait(self):
+        """
+        每次两次截图间隔时间
+        """
+        if self.config.Emulator_ScreenshotAdaptive:
+            self._screenshot_interval.limit = self.screenshot_pacer.interval(self.input_time)
+        self._screenshot_interval.wait()
+        self._screenshot_interval.reset()
+
+    @cached_property
+    def screenshot_history(self):
+        return ScreenshotHistory(
+            length=self.config.Error_ScreenshotLength,
+            ext=self.config.Error_ScreenshotFormat,
+            quality=self.config.Error_ScreenshotQuality,
+        )
 
     def screenshot(self):
         """
@@ -42,20 +142,102 @@ class Screenshot(ScreenshotMultiInheritance):
         Returns:
             np.ndarray:
         """
-
-        # 每次两次截图间隔时间
-        self._screenshot_interval.wait()
-        self._screenshot_interval.reset()
-
-        method = self.screenshot_methods.get(self.config.Emulator_ScreenshotMethod)
-        self.image = method()
+        if self.config.Emulator_ScreenshotPrefetch:
+            self.image = self.screenshot_prefetch_get()
+        else:
+            self._screenshot_wait()
+            method = self.screenshot_method()
+            self.image = method()
 
         self.image = self._handle_orientated_image(self.image)
+        FRAME_CACHE.new_frame(self.image)
+        if self.config.Emulator_ScreenshotAdaptive:
+            self.screenshot_pacer.update(self.image, self.input_time)
 
-        self.screenshot_deque.append({"time": datetime.now(), "image": self.image})
+        self.screenshot_history.append(self.image, datetime.now())
 
         return self.image
 
+    _prefetch_thread: threading.Thread = None
+    # (start_time, image) of the newest completed frame, start_time is time.time() when fetching started
+    _prefetch_frame = None
+    _prefetch_error: Exception = None
+    # Start time of the frame returned last time
+    _prefetch_returned = 0.
+
+    @cached_property
+    def _prefetch_condition(self):
+        return threading.Condition()
+
+    def screenshot_prefetch_start(self):
+        """
+        Start a worker thread that keeps fetching screenshots in background,
+        so device I/O runs while the previous screenshot is being processed.
+        """
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+            return
+        logger.info('Screenshot prefetch start')
+        self._prefetch_frame = None
+        self._prefetch_error = None
+        self._prefetch_thread = threading.Thread(
+            target=self._screenshot_prefetch_worker, name='ScreenshotPrefetch', daemon=True)
+        self._prefetch_thread.start()
+
+    def screenshot_prefetch_stop(self):
+        thread = self._prefetch_thread
+        if thread is None:
+            return
+        logger.info('Screenshot prefetch stop')
+        self._prefetch_thread = None
+        with self._prefetch_condition:
+            self._prefetch_condition.notify_all()
+        thread.join(timeout=5)
+
+    def _screenshot_prefetch_worker(self):
+        thread = threading.current_thread()
+        while self._prefetch_thread is thread:
+            self._screenshot_wait()
+            start = time.time()
+            try:
+                method = self.screenshot_method()
+                image = method()
+            except Exception as e:
+                # Raise in main thread, the retry wrappers have already done their job
+                with self._prefetch_condition:
+                    self._prefetch_error = e
+                    self._prefetch_thread = None
+                    self._prefetch_condition.notify_all()
+                return
+            with self._prefetch_condition:
+                self._prefetch_frame = (start, image)
+                self._prefetch_condition.notify_all()
+                # Don't fetch further until this frame is consumed or outdated by an input,
+                # a waiting frame is as good as a new one and saves device load.
+                while self._prefetch_thread is thread \
+                        and self._prefetch_frame is not None \
+                        and self._prefetch_frame[0] > self._prefetch_returned \
+                        and self._prefetch_frame[0] > self.input_time:
+                    self._prefetch_condition.wait(timeout=0.05)
+
+    def screenshot_prefetch_get(self):
+        """
+        Returns:
+            np.ndarray: The newest prefetched screenshot, which started fetching after the last input
+                and after the screenshot returned last time. Blocks until there is one.
+        """
+        self.screenshot_prefetch_start()
+        with self._prefetch_condition:
+            while 1:
+                if self._prefetch_error is not None:
+                    e, self._prefetch_error = self._prefetch_error, None
+                    raise e
+                frame = self._prefetch_frame
+                if frame is not None and frame[0] > self._prefetch_returned and frame[0] > self.input_time:
+                    self._prefetch_returned = frame[0]
+                    self._prefetch_condition.notify_all()
+                    return frame[1]
+                self._prefetch_condition.wait(timeout=0.05)
+
     def _handle_orientated_image(self, image):
         """
         Args:
@@ -5,6 +5,14 @@ from module.exception import GameStuckError, GameServerUnderMaintenance
 from module.handler.assets import *
 from module.logger import logger
 
+# Static checks in ui_additional(), which runs on every frame of ui_ensure() and ui_click().
+# Calibrated the same as Page.CHECK_PREFILTER, 40 rejects 91% to 99% of the screenshots in ./assets
+# where they don't match, without rejecting those where they do.
+LEVEL_UP_CHECK.prefilter = 40
+LOGIN_PAGE_CHECK.prefilter = 40
+LOGIN_CHECK.prefilter = 40
+LOGIN_CHECK_B.prefilter = 40
+
 
 class InfoHandler(ModuleBase):
     def handle_paid_gift(self, interval=1):
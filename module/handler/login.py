@@ -36,11 +36,12 @@ class LoginHandler(UI):
             else:
                 confirm_timer.reset()
                 
-            if self.appear_text('将下载'):
+            texts = self.appear_texts(['将下载', '正在下载游戏执行所需'])
+            if texts['将下载']:
                 self.appear_text_then_click('确认')
                 continue
 
-            if self.appear_text('正在下载游戏执行所需'):
+            if texts['正在下载游戏执行所需']:
                 self.device.stuck_record_clear()
                 self.device.click_record_clear()
                 self.device.sleep(20)
@@ -9,6 +9,7 @@ from module.ui.ui import UI
 
 
 class NikkeSurvivors(UI):
+    ocr_preload = ['cnocr']
 
     def run(self):
         click_timer = Timer(0.2)
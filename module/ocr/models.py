@@ -1,12 +1,98 @@
-from functools import cached_property
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
-from module.ocr.nikke_ocr import NikkeOcr
+from module.logger import logger
+
+# Loads models in background, see OcrModel.preload()
+OCR_PRELOAD = ThreadPoolExecutor(max_workers=1, thread_name_prefix='OcrPreload')
+
+
+class ocr_model:
+    """
+    Same as cached_property, but thread safe and timed, so a model can be loaded by
+    OcrModel.preload() and requested by the task at the same time.
+
+    torch and cnocr are imported at the first model loading, not at importing this module.
+    If OCR server is set, a RemoteOcr proxy is returned instead of loading the model.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        self.lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self.lock:
+            model = instance.__dict__.get(self.name)
+            if model is None:
+                if instance.server is not None:
+                    from module.ocr.server import RemoteOcr
+                    model = RemoteOcr(self.name, instance.server, loader=lambda: self.load(instance))
+                else:
+                    model = self.load(instance)
+                instance.__dict__[self.name] = model
+        return model
+
+    def load(self, instance):
+        start = time.perf_counter()
+        model = self.func(instance)
+        logger.info(f'OCR model loaded: {self.name} '
+                    f'({round(time.perf_counter() - start, 2)}s, {threading.current_thread().name})')
+        return model
 
 
 class OcrModel:
-    @cached_property
+    # 'pytorch' or 'onnx', see NikkeOcr
+    backend = 'pytorch'
+    threads = 0
+    # OcrClient, None to load models in process
+    server = None
+
+    def set_backend(self, backend, threads=0):
+        """
+        Set backend of models loaded after this.
+
+        Args:
+            backend (str): 'pytorch' or 'onnx'.
+            threads (int): Threads of ONNX session, 0 to let onnxruntime decide.
+        """
+        if backend != self.backend or threads != self.threads:
+            logger.info(f'OCR backend: {backend}, threads: {threads}')
+        self.backend = backend
+        self.threads = threads
+
+    def set_server(self, port):
+        """
+        Use the shared OCR server for models loaded after this, see module/ocr/server.py
+        Models are loaded in process if server is not running.
+
+        Args:
+            port (int):
+
+        Returns:
+            bool: If connected.
+        """
+        from multiprocessing import AuthenticationError
+        from module.ocr.server import OcrClient
+        try:
+            self.server = OcrClient(port)
+        except (OSError, AuthenticationError) as e:
+            logger.warning(f'OCR server not available on port {port}, load models in process: {e}')
+            self.server = None
+            return False
+        logger.info(f'OCR server connected on port {port}')
+        return True
+
+    @ocr_model
     def nikke(self):
         """
             t20
@@ -21,10 +107,12 @@ class OcrModel:
             epochs: 15
             mainly used for the rookie arena
         """
+        from module.ocr.nikke_ocr import NikkeOcr
         return NikkeOcr(rec_model_name='densenet_lite_136-gru', root='./bin/cnocr_models/nikke',
-                        model_name='/t25.ckpt', name='nikke')
+                        model_name='/t25.ckpt', name='nikke',
+                        backend=self.backend, threads=self.threads)
 
-    @cached_property
+    @ocr_model
     def arena(self):
         """
             t27
@@ -33,8 +121,10 @@ class OcrModel:
             epochs: 15
             mainly used for the rookie arena
         """
+        from module.ocr.nikke_ocr import NikkeOcr
         return NikkeOcr(rec_model_name='densenet_lite_136-gru', root='./bin/cnocr_models/nikke',
-                        model_name='/t27.ckpt', name='arena')
+                        model_name='/t27.ckpt', name='arena',
+                        backend=self.backend, threads=self.threads)
 
     # @cached_property
     # def nikke_digit(self):
@@ -45,15 +135,45 @@ class OcrModel:
     # def nikke_counter(self):
     #     return NikkeOcr(rec_model_name='densenet_lite_136-gru', root='./bin/cnocr_models/nikke',
     #                     model_name='/t23.ckpt', name='nikke_counter', cand_alphabet='0123456789/IDS'
-    @cached_property
+    @ocr_model
     def cnocr(self):
+        from module.ocr.nikke_ocr import NikkeOcr
         return NikkeOcr(rec_model_name='densenet_lite_136-fc', root='./bin/cnocr_models/cnocr',
-                        model_name='/cnocr-v2.2-densenet_lite_136-fc.ckpt', name='cnocr')
+                        model_name='/cnocr-v2.2-densenet_lite_136-fc.ckpt', name='cnocr',
+                        backend=self.backend, threads=self.threads)
 
-    @cached_property
+    @ocr_model
     def cnocr_gru(self):
+        from module.ocr.nikke_ocr import NikkeOcr
         return NikkeOcr(rec_model_name='densenet_lite_136-gru', root='./bin/cnocr_models/cnocr',
-                        model_name='/cnocr-v2.2-densenet_lite_136-gru.ckpt', name='cnocr')
+                        model_name='/cnocr-v2.2-densenet_lite_136-gru.ckpt', name='cnocr',
+                        backend=self.backend, threads=self.threads)
+
+    def loaded(self, name):
+        return name in self.__dict__
+
+    def preload(self, names):
+        """
+        Load models in a background thread, so the first OCR in task doesn't wait for loading.
+
+        Args:
+            names (list[str]): Model names, such as ['cnocr', 'arena']
+
+        Returns:
+            Future: None if all loaded.
+        """
+        names = [name for name in names if not self.loaded(name)]
+        if not names:
+            return None
+        return OCR_PRELOAD.submit(self._preload, names)
+
+    def _preload(self, names):
+        for name in names:
+            try:
+                self.__getattribute__(name)
+            except Exception as e:
+                # Raised again when the task requests this model
+                logger.warning(f'OCR model preload failed: {name}, {e}')
 
     def get_location(self, text, result):
         if result:
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import Union, List, Dict, Any, Tuple
 
@@ -7,18 +8,68 @@ from PIL import Image
 from cnocr import CnOcr
 
 from module.base.utils import crop
+from module.logger import logger
+
+# onnxruntime.InferenceSession of recognizers, key: (model_fp, threads)
+ONNX_SESSIONS = {}
+
+
+def onnx_model_fp(model_fp):
+    """
+    Path of the ONNX model exported from a checkpoint, see dev_tools/ocr_onnx_export.py
+    """
+    return os.path.splitext(model_fp)[0] + '.onnx'
+
+
+def onnx_session(model_fp, threads=0):
+    """
+    Args:
+        model_fp (str): Path to .onnx file.
+        threads (int): Intra-op threads, 0 to let onnxruntime decide.
+
+    Returns:
+        onnxruntime.InferenceSession: Shared by models using the same file.
+    """
+    key = (model_fp, threads)
+    session = ONNX_SESSIONS.get(key)
+    if session is None:
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(model_fp, sess_options=options, providers=['CPUExecutionProvider'])
+        ONNX_SESSIONS[key] = session
+    return session
 
 
 class NikkeOcr(CnOcr):
     def __init__(self, rec_model_name='densenet_lite_136-gru', det_model_name='ch_PP-OCRv3_det', cand_alphabet=None,
                  context='cpu',
                  root='./bin/cnocr_models/nikke',
-                 model_name='/t25.ckpt', **kwargs):
+                 model_name='/t25.ckpt', backend='pytorch', threads=0, **kwargs):
+        """
+        Args:
+            backend (str): 'pytorch' or 'onnx'.
+                'onnx' uses the .onnx file next to the checkpoint, fallback to 'pytorch' if it doesn't exist.
+            threads (int): Threads of ONNX session, 0 to let onnxruntime decide.
+        """
         model_fp = root + model_name
+        if backend == 'onnx':
+            if os.path.exists(onnx_model_fp(model_fp)):
+                model_fp = onnx_model_fp(model_fp)
+            else:
+                logger.warning(f'ONNX model not found: {onnx_model_fp(model_fp)}, use pytorch backend. '
+                               f'Run `python -m dev_tools.ocr_onnx_export` to export')
+                backend = 'pytorch'
+        self.backend = backend
         super().__init__(rec_model_name=rec_model_name, det_model_name=det_model_name, rec_model_fp=model_fp,
                          cand_alphabet=cand_alphabet, context=context,
-                         rec_model_backend='pytorch',
+                         rec_model_backend=backend,
                          **kwargs)
+        if backend == 'onnx':
+            # Replace the session cnocr created, to set threads and share it between models
+            self.rec_model._model = onnx_session(model_fp, threads=threads)
 
     def ocr(
             self,
@@ -0,0 +1,217 @@
+"""
+Shared OCR server, so NKAS instances on the same host use one copy of each model.
+
+Start it before instances, then set OCR_SERVER = True in ManualConfig:
+    python -m module.ocr.server [backend] [threads]
+"""
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from module.base.utils import crop
+from module.logger import logger
+
+# Random authkey of this host, created by the first server start and read by clients.
+# multiprocessing.connection unpickles requests, so only processes of the same user should be able to connect.
+OCR_SERVER_KEY_FILE = './config/ocr_server.key'
+# Requests arriving within this window are handled as one batch
+BATCH_WINDOW = 0.01
+
+
+class OcrServerError(Exception):
+    pass
+
+
+def read_authkey():
+    """
+    Raises:
+        OSError: If server has never started on this host.
+    """
+    with open(OCR_SERVER_KEY_FILE, 'rb') as f:
+        return f.read()
+
+
+def create_authkey():
+    """
+    Returns:
+        bytes: Authkey in key file, created readable by current user only if not exists.
+    """
+    try:
+        fd = os.open(OCR_SERVER_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return read_authkey()
+    key = os.urandom(32)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    logger.info(f'OCR server key created: {OCR_SERVER_KEY_FILE}')
+    return key
+
+
+class OcrServer:
+    def __init__(self, port, backend='pytorch', threads=0):
+        """
+        Args:
+            port (int): Listen on 127.0.0.1:<port>
+            backend (str): Backend of models, see OcrModel.set_backend()
+            threads (int):
+        """
+        from module.ocr.models import OcrModel
+        self.address = ('127.0.0.1', port)
+        self.models = OcrModel()
+        self.models.set_backend(backend, threads=threads)
+        self.queue = queue.Queue()
+
+    def serve(self):
+        listener = Listener(self.address, authkey=create_authkey())
+        threading.Thread(target=self._worker, name='OcrWorker', daemon=True).start()
+        logger.info(f'OCR server listening on {self.address[0]}:{self.address[1]}')
+        while 1:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError) as e:
+                # Failed authentication or client gone during handshake
+                logger.warning(f'OCR server accept failed: {e}')
+                continue
+            threading.Thread(target=self._receive, args=(conn,), name='OcrConnection', daemon=True).start()
+
+    def _receive(self, conn):
+        """
+        Clients wait for each reply before sending the next request, so the worker can reply to conn directly.
+        """
+        try:
+            while 1:
+                self.queue.put((conn, conn.recv()))
+        except (OSError, EOFError):
+            conn.close()
+
+    def _worker(self):
+        while 1:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + BATCH_WINDOW
+            while 1:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch):
+        """
+        Recognize lines of all `ocr_for_single_lines` requests to the same model in one call,
+        other requests are done one by one.
+
+        Args:
+            batch (list): [(conn, (name, method, arg, kwargs)), ...]
+        """
+        lines = {}
+        for conn, request in batch:
+            name, method, arg, kwargs = request
+            if method == 'ocr_for_single_lines' and not kwargs:
+                lines.setdefault(name, []).append((conn, arg))
+            else:
+                self._reply(conn, lambda: getattr(self.models.__getattribute__(name), method)(arg, **kwargs))
+
+        for name, requests in lines.items():
+            images = [image for _, arg in requests for image in arg]
+            try:
+                results = self.models.__getattribute__(name).ocr_for_single_lines(images)
+            except Exception as e:
+                logger.exception(e)
+                for conn, _ in requests:
+                    self._send(conn, ('error', f'{type(e).__name__}: {e}'))
+                continue
+            start = 0
+            for conn, arg in requests:
+                self._send(conn, ('ok', results[start:start + len(arg)]))
+                start += len(arg)
+
+    def _reply(self, conn, func):
+        try:
+            result = ('ok', func())
+        except Exception as e:
+            logger.exception(e)
+            result = ('error', f'{type(e).__name__}: {e}')
+        self._send(conn, result)
+
+    @staticmethod
+    def _send(conn, data):
+        try:
+            conn.send(data)
+        except (OSError, EOFError):
+            pass
+
+
+class OcrClient:
+    def __init__(self, port):
+        """
+        Raises:
+            OSError: If server is not running, or has never started on this host.
+        """
+        self.conn = Client(('127.0.0.1', port), authkey=read_authkey())
+        # Models are used by task and OcrModel.preload() thread
+        self.lock = threading.Lock()
+
+    def request(self, name, method, arg, kwargs):
+        with self.lock:
+            self.conn.send((name, method, arg, kwargs))
+            status, result = self.conn.recv()
+        if status != 'ok':
+            raise OcrServerError(result)
+        return result
+
+
+class RemoteOcr:
+    backend = 'server'
+
+    def __init__(self, name, client, loader):
+        """
+        Model proxy that sends requests to OCR server, and loads the model in process if server fails.
+
+        Args:
+            name (str): Model name in OcrModel.
+            client (OcrClient):
+            loader (callable): Load the model in process.
+        """
+        self.name = name
+        self.client = client
+        self.loader = loader
+        self.local = None
+
+    def _call(self, method, arg, **kwargs):
+        if self.local is None:
+            try:
+                return self.client.request(self.name, method, arg, kwargs)
+            except (OSError, EOFError, OcrServerError) as e:
+                logger.warning(f'OCR server failed, load model {self.name} in process: {e}')
+                self.local = self.loader()
+        return getattr(self.local, method)(arg, **kwargs)
+
+    def ocr(self, img_fp, area=None, **kwargs):
+        # Send the cropped image only
+        if area:
+            img_fp = crop(img_fp, area)
+        return self._call('ocr', img_fp, **kwargs)
+
+    def ocr_for_single_lines(self, img_list, **kwargs):
+        return self._call('ocr_for_single_lines', list(img_list), **kwargs)
+
+    def ocr_for_single_line(self, img_fp):
+        return self.ocr_for_single_lines([img_fp])[0]
+
+
+if __name__ == '__main__':
+    from module.config.manual_config import ManualConfig
+
+    server = OcrServer(
+        port=ManualConfig.OCR_SERVER_PORT,
+        backend=sys.argv[1] if len(sys.argv) > 1 else ManualConfig.OCR_BACKEND,
+        threads=int(sys.argv[2]) if len(sys.argv) > 2 else ManualConfig.OCR_THREADS,
+    )
+    server.models.preload(ManualConfig.OCR_PRELOAD)
+    server.serve()
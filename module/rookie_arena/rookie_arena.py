@@ -23,6 +23,8 @@ class RookieArenaIsUnavailable(Exception):
 
 
 class RookieArena(UI):
+    ocr_preload = ['arena']
+
     @property
     def free_opportunity_remain(self) -> bool:
         result = FREE_OPPORTUNITY_CHECK.appear_on(self.device.image, 20)
@@ -14,6 +14,8 @@ from module.ui.page import page_shop
 
 
 class RubbishShop(ShopBase):
+    ocr_preload = ['cnocr']
+
     @cached_property
     def assets(self) -> dict:
         return exec_file("./module/rubbish_shop/assets.py")
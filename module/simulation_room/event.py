@@ -1,3 +1,4 @@
+from module.base.template_bank import TemplateBank
 from module.base.timer import Timer
 from module.base.utils import point2str
 from module.exception import OperationFailed
@@ -7,6 +8,8 @@ from module.simulation_room.assets import *
 from module.tribe_tower.assets import OPERATION_FAILED
 from module.ui.ui import UI
 
+EFFECT_BANK = TemplateBank([EPIC_CHECK, SSR_CHECK, SR_CHECK, R_CHECK], name='EFFECT', pyramid=2)
+
 
 class EventBase(UI):
     def __init__(self, button, *args, **kwargs):
@@ -15,17 +18,14 @@ class EventBase(UI):
 
     def get_effect(self):
         for x in range(3):
-            for i in [EPIC_CHECK, SSR_CHECK, SR_CHECK, R_CHECK]:
-                if self.appear(i, offset=(10, 10), static=False):
-                    return i.location
+            hits = self.appear_bank(EFFECT_BANK, offset=(10, 10), static=False, first=True)
+            if hits:
+                return hits[0]['location']
             self.device.screenshot()
 
     def get_effect_list(self):
         for x in range(3):
-            _ = []
-            for i in [EPIC_CHECK, SSR_CHECK, SR_CHECK, R_CHECK]:
-                if self.appear(i, offset=(10, 10), static=False):
-                    _.append(i.location)
+            _ = [hit['location'] for hit in self.appear_bank(EFFECT_BANK, offset=(10, 10), static=False)]
             if len(_):
                 _.sort(key=lambda x: x[1])
                 return _
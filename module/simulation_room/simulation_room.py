@@ -6,6 +6,7 @@ from module.exception import GamePageUnknownError, OperationFailed, GameStuckErr
 from module.handler.assets import CONFIRM_B
 from module.logger import logger
 from module.simulation_room.assets import *
+from module.simulation_room.event import EFFECT_BANK
 from module.tribe_tower.assets import BACK
 from module.ui.assets import ARK_GOTO_SIMULATION_ROOM, SIMULATION_ROOM_CHECK, GOTO_BACK
 from module.ui.page import page_ark
@@ -105,9 +106,9 @@ class SimulationRoom(UI):
 
     def get_effect(self):
         for x in range(3):
-            for i in [EPIC_CHECK, SSR_CHECK, SR_CHECK, R_CHECK]:
-                if self.appear(i, offset=(10, 10), static=False):
-                    return i.location
+            hits = self.appear_bank(EFFECT_BANK, offset=(10, 10), static=False, first=True)
+            if hits:
+                return hits[0]['location']
             self.device.screenshot()
 
     def choose_effect(self, skip_first_screenshot=True):
@@ -1,5 +1,6 @@
 from functools import cached_property
 
+from module.base.template_bank import TemplateBank
 from module.base.timer import Timer
 from module.base.utils import point2str
 from module.exception import OperationFailed
@@ -10,6 +11,8 @@ from module.ui.assets import TRIBE_TOWER_CHECK, GOTO_BACK, MAIN_CHECK
 from module.ui.page import page_tribe_tower
 from module.ui.ui import UI
 
+OPPORTUNITY_BANK = TemplateBank([OPPORTUNITY_0, OPPORTUNITY_1, OPPORTUNITY_2, OPPORTUNITY_3], name='OPPORTUNITY', pyramid=2)
+
 
 class NoOpportunityRemain(Exception):
     pass
@@ -26,12 +29,10 @@ class TribeTower(UI):
     @property
     def _opportunity(self) -> int:
         for x in range(3):
-            for index, i in enumerate(
-                    [OPPORTUNITY_0, OPPORTUNITY_1, OPPORTUNITY_2, OPPORTUNITY_3]
-            ):
-                if self.appear(i, offset=(5, 5), threshold=0.96, static=False):
-                    self.opportunity = index
-                    return self.opportunity
+            hits = self.appear_bank(OPPORTUNITY_BANK, offset=(5, 5), threshold=0.96, static=False, first=True)
+            if hits:
+                self.opportunity = OPPORTUNITY_BANK.buttons.index(hits[0]['button'])
+                return self.opportunity
             self.device.screenshot()
         raise NoOpportunityRemain
 
@@ -1,13 +1,23 @@
 import traceback
 
+import cv2
+import numpy as np
+
+from module.base.frame import FRAME_CACHE
 from module.ui.assets import *
 
 
 class Page:
     parent = None
+    # Color tolerance of the match prefilter on check buttons, which are checked on every frame in ui_ensure().
+    # On the screenshots in ./assets, check buttons need 0.9 at most where they match,
+    # and 40 rejects 98% of the screenshots where they don't, see dev_tools/prefilter_benchmark.py
+    CHECK_PREFILTER = 40
 
     def __init__(self, check_button):
         self.check_button = check_button
+        if check_button is not None:
+            check_button.prefilter = self.CHECK_PREFILTER
         self.links = {}
         (filename, line_number, function_name, text) = traceback.extract_stack()[-2]
         self.name = text[:text.find('=')].strip()
@@ -25,6 +35,65 @@ class Page:
         self.links[destination] = button
 
 
+class PageIndex:
+    # Pages whose check area colors are further than this from their signature at every position within
+    # the matching offset are skipped. Same as Page.CHECK_PREFILTER, measured by dev_tools/prefilter_benchmark.py.
+    SKIP_DISTANCE = 40
+
+    def __init__(self, pages, candidates=3, offset=30):
+        """
+        Signature index of Page.check_button, to find the current page without matching every page.
+        Mean colors of all check areas at every position within offset are calculated on the integral image,
+        pages whose colors are closest to their signature are template matched first,
+        and pages that can't be there are not matched.
+
+        Args:
+            pages (list[Page]):
+            candidates (int): Amount of pages to be checked first.
+            offset (int): Offset used in matching check buttons.
+        """
+        self.pages = [page for page in pages if page.check_button is not None]
+        self.candidates = candidates
+        self.offset = offset
+
+    def distance(self, image):
+        """
+        Args:
+            image (np.ndarray): Screenshot.
+
+        Returns:
+            np.ndarray: Lowest color tolerance of each page within offset, see Button.color_distance().
+        """
+        integral = FRAME_CACHE.integral(image, force=True)
+        if integral is None:
+            integral = cv2.integral(image)
+        distance = np.zeros(len(self.pages))
+        for index, page in enumerate(self.pages):
+            x1, y1, x2, y2 = page.check_button.area
+            search_area = (x1 - self.offset, y1 - self.offset, x2 + self.offset, y2 + self.offset)
+            result = page.check_button.color_distance(image, search_area, integral)
+            if result is not None:
+                distance[index] = result
+        return distance
+
+    def sort(self, image):
+        """
+        Args:
+            image (np.ndarray): Screenshot.
+
+        Returns:
+            list[Page]: Top candidates in original order, then the rest in original order,
+                pages beyond SKIP_DISTANCE are dropped. Usually hits within the first few.
+                If check buttons of several pages match the same frame,
+                the one ranked first wins, which may not be the first one in original order.
+        """
+        distance = self.distance(image)
+        top = np.argsort(distance, kind='stable')[:self.candidates]
+        top = sorted(top.tolist())
+        rest = [index for index in range(len(self.pages)) if index not in top]
+        return [self.pages[index] for index in top + rest if distance[index] <= self.SKIP_DISTANCE]
+
+
 # Main
 page_main = Page(MAIN_CHECK)
 
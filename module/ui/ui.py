@@ -1,11 +1,12 @@
 from module.base.decorator import run_once
+from module.base.template_bank import TemplateBank
 from module.base.timer import Timer
 from module.exception import GameNotRunningError, GamePageUnknownError, GameStart
 from module.handler.assets import *
 from module.handler.info_handle import InfoHandler
 from module.logger import logger
 from module.ui.assets import GOTO_MAIN
-from module.ui.page import (Page, page_unknown, page_main, page_reward, page_destroy, page_friend, page_daily,
+from module.ui.page import (Page, PageIndex, page_unknown, page_main, page_reward, page_destroy, page_friend, page_daily,
                             page_shop, page_cash_shop, page_team, page_inventory, page_pass,
                             page_conversation, page_ark, page_tribe_tower, page_simulation_room, page_arena,
                             page_rookie_arena,
@@ -13,6 +14,8 @@ from module.ui.page import (Page, page_unknown, page_main, page_reward, page_des
                             page_special_interception,
                             page_mailbox)
 
+CONFIRM_BANK = TemplateBank([CONFIRM_A, CONFIRM_B, CONFIRM_C], name='CONFIRM', pyramid=2)
+
 
 class UI(InfoHandler):
     ui_pages = [page_unknown,
@@ -40,6 +43,8 @@ class UI(InfoHandler):
                 page_special_interception,
                 ]
 
+    ui_page_index = PageIndex(ui_pages)
+
     def ui_page_appear(self, page: Page):
         """
             Args:
@@ -75,9 +80,7 @@ class UI(InfoHandler):
                 break
 
             # Known pages
-            for page in self.ui_pages:
-                if page.check_button is None:
-                    continue
+            for page in self.ui_page_index.sort(self.device.image):
                 if self.ui_page_appear(page=page):
                     logger.attr("UI", page.name)
                     self.ui_current = page
@@ -247,16 +250,8 @@ class UI(InfoHandler):
         '''
 
         # 未知弹窗的确认
-        if self.appear(CONFIRM_A, offset=(30, 30), interval=3, static=False):
-            self.device.click(CONFIRM_A)
-            return True
-
-        if self.appear(CONFIRM_B, offset=(30, 30), interval=3, static=False):
-            self.device.click(CONFIRM_B)
-            return True
-
-        if self.appear(CONFIRM_C, offset=(30, 30), interval=3, static=False):
-            self.device.click(CONFIRM_C)
+        for hit in self.appear_bank(CONFIRM_BANK, offset=(30, 30), interval=3, static=False, first=True):
+            self.device.click(hit['button'])
             return True
 
     def ui_goto_main(self):